@@ -0,0 +1,155 @@
+"""Замеры представлений блога на сгенерированном корпусе.
+
+Запуск отдельно от функциональных тестов:
+
+    pytest benchmarks/ --bench-posts 5000 --bench-output results.json
+
+Для каждого представления записываются время (медиана по раундам),
+число SQL-запросов, суммарное время SQL и размер ответа. Анонимные
+страницы замеряются дважды: [anonymous] — с пустым кэшем страниц
+в каждом раунде, [anonymous-cached] — попадание в кэш. Если есть
+базовый файл (--bench-baseline), замер падает, когда представление
+медленнее базы больше чем на --bench-threshold или выполняет больше
+запросов. --bench-update-baseline перезаписывает базу результатами.
+"""
+import json
+import statistics
+import time
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-users', type=int, default=200)
+    group.addoption('--bench-posts', type=int, default=2000)
+    group.addoption('--bench-comments', type=int, default=20000)
+    group.addoption('--bench-rounds', type=int, default=5)
+    group.addoption('--bench-output', default=str(BENCH_DIR / 'results.json'))
+    group.addoption('--bench-baseline',
+                    default=str(BENCH_DIR / 'baseline.json'))
+    group.addoption('--bench-threshold', type=float, default=0.25,
+                    help='Допустимое замедление относительно базы, доля.')
+    group.addoption('--bench-update-baseline', action='store_true')
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, request):
+    options = request.config.option
+    with django_db_blocker.unblock():
+        call_command(
+            'generate_corpus',
+            users=options.bench_users,
+            posts=options.bench_posts,
+            comments=options.bench_comments,
+            seed=1,
+            stdout=StringIO(),
+        )
+
+
+class QueryTimer:
+    """Обёртка connection.execute_wrapper: число и время запросов.
+
+    Время из CaptureQueriesContext округлено до миллисекунд и для
+    быстрых запросов равно нулю, поэтому замеряем сами.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class Recorder:
+    """Собирает замеры и сравнивает их с базой."""
+
+    def __init__(self, config):
+        self.options = config.option
+        self.results = {}
+        baseline = Path(self.options.bench_baseline)
+        self.baseline = (
+            json.loads(baseline.read_text()) if baseline.exists() else {})
+
+    def measure(self, name, request, setup=None):
+        """Выполнить request() несколько раундов после прогрева.
+
+        setup() готовит данные раунда и в замер не входит; его
+        результат передаётся в request().
+        """
+        timings, sql_timings = [], []
+        request(setup() if setup else None)
+        for _ in range(self.options.bench_rounds):
+            argument = setup() if setup else None
+            timer = QueryTimer()
+            with connection.execute_wrapper(timer):
+                started = time.perf_counter()
+                response = request(argument)
+                elapsed = time.perf_counter() - started
+            assert response.status_code < 400, name
+            timings.append(elapsed * 1000)
+            sql_timings.append(timer.seconds * 1000)
+        result = {
+            'wall_ms': round(statistics.median(timings), 3),
+            'sql_ms': round(statistics.median(sql_timings), 3),
+            'queries': timer.queries,
+            'bytes': len(response.content),
+        }
+        self.results[name] = result
+        self.check(name, result)
+        return result
+
+    def check(self, name, result):
+        if self.options.bench_update_baseline or name not in self.baseline:
+            return
+        base = self.baseline[name]
+        limit = base['wall_ms'] * (1 + self.options.bench_threshold)
+        assert result['queries'] <= base['queries'], (
+            f'{name}: запросов {result["queries"]}, '
+            f'в базовом замере {base["queries"]}.'
+        )
+        assert result['wall_ms'] <= limit, (
+            f'{name}: {result["wall_ms"]} мс, допустимо {limit:.3f} мс '
+            f'(база {base["wall_ms"]} мс).'
+        )
+
+    def save(self):
+        output = Path(self.options.bench_output)
+        output.write_text(json.dumps(self.results, indent=2, sort_keys=True))
+        if self.options.bench_update_baseline:
+            Path(self.options.bench_baseline).write_text(
+                json.dumps(self.results, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope='session')
+def bench(request):
+    recorder = Recorder(request.config)
+    yield recorder
+    recorder.save()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def cold_pages():
+    """setup для measure(): перед каждым раундом очищает кэш страниц,
+    чтобы замерялась отрисовка, а не попадание в кэш."""
+    return caches[settings.PAGE_CACHE_ALIAS].clear
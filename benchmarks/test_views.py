@@ -0,0 +1,88 @@
+import pytest
+from django.db.models import Count, Q
+from django.test import Client
+
+from blog.models import Category, Comment, Post, User
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def author():
+    """Самый плодовитый автор корпуса."""
+    return User.objects.annotate(
+        posts=Count('post')).order_by('-posts').first()
+
+
+@pytest.fixture
+def hot_post():
+    """Публикация с самым длинным обсуждением."""
+    return Post.objects.published().order_by('-comment_count').first()
+
+
+@pytest.fixture
+def category():
+    return Category.objects.filter(is_published=True).annotate(
+        posts=Count('post', filter=Q(post__is_published=True)),
+    ).order_by('-posts').first()
+
+
+@pytest.fixture(params=['anonymous', 'user'])
+def audience(request, author):
+    client = Client()
+    if request.param == 'user':
+        client.force_login(author)
+    return request.param, client
+
+
+@pytest.mark.parametrize('url', [
+    'index:/',
+    'index_page_5:/?page=5',
+    'post_detail:/posts/{post.id}/',
+    'category_posts:/category/{category.slug}/',
+    'profile:/profile/{author.username}/',
+    'about:/pages/about/',
+    'rules:/pages/rules/',
+])
+def test_read_views(bench, cold_pages, audience, url, hot_post, category,
+                    author):
+    name, url = url.split(':', 1)
+    url = url.format(post=hot_post, category=category, author=author)
+    audience_name, client = audience
+    bench.measure(f'{name}[{audience_name}]', lambda _: client.get(url),
+                  setup=cold_pages)
+    if audience_name == 'anonymous':
+        bench.measure(f'{name}[anonymous-cached]',
+                      lambda _: client.get(url))
+
+
+@pytest.fixture
+def user_client(author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+def test_comment_create(bench, user_client, hot_post):
+    bench.measure('comment_create', lambda _: user_client.post(
+        f'/posts/{hot_post.id}/comment/', {'text': 'Замер'}))
+
+
+def _comment(author, post):
+    return lambda: Comment.objects.create(
+        text='Замер', author=author, post=post)
+
+
+def test_comment_edit(bench, user_client, author, hot_post):
+    bench.measure('comment_edit', lambda comment: user_client.post(
+        f'/posts/{hot_post.id}/edit_comment/{comment.id}/',
+        {'text': 'Замер, правка'},
+    ), setup=_comment(author, hot_post))
+
+
+def test_comment_delete(bench, user_client, author, hot_post):
+    bench.measure('comment_delete', lambda comment: user_client.post(
+        f'/posts/{hot_post.id}/delete_comment/{comment.id}/',
+    ), setup=_comment(author, hot_post))
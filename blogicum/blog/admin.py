@@ -1,10 +1,26 @@
 from django.contrib import admin
+from django.utils import timezone
 
-from blog.models import Category, Comment, Location, Post
+from blog.export import FORMATS, streaming_export
+from blog.models import Category, Comment, Job, Location, Post
+
+
+def export_actions(name):
+    """Действия «выгрузить выбранные» во всех форматах выгрузки."""
+    actions = []
+    for export_format in FORMATS:
+        def export(modeladmin, request, queryset, export_format=export_format):
+            return streaming_export(name, export_format, queryset)
+        export.__name__ = f'export_{export_format}'
+        export.short_description = (
+            f'Выгрузить выбранные в {export_format.upper()}')
+        actions.append(export)
+    return actions
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
+    actions = export_actions('post')
     list_display = ('is_published',
                     'created_at',
                     'title',
@@ -32,6 +48,7 @@ class PostAdmin(admin.ModelAdmin):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
+    actions = export_actions('category')
     list_display = (
         'is_published',
         'created_at',
@@ -43,6 +60,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
+    actions = export_actions('location')
     list_display = (
         'is_published',
         'created_at',
@@ -52,6 +70,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
+    actions = export_actions('comment')
     list_display = ('is_published',
                     'created_at',
                     'text',
@@ -62,4 +81,33 @@ class CommentAdmin(admin.ModelAdmin):
     list_display_links = ('is_published',)
 
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name',
+                    'status',
+                    'attempts',
+                    'run_after',
+                    'created_at',
+                    'finished_at',
+                    )
+    list_filter = ('status',
+                   'name',
+                   )
+    readonly_fields = ('attempts',
+                       'created_at',
+                       'started_at',
+                       'finished_at',
+                       'last_error',
+                       )
+    actions = ('retry',)
+
+    @admin.action(description='Повторить выбранные задачи')
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+        )
+
+
 admin.site.empty_value_display = 'Не задано'
@@ -0,0 +1,98 @@
+from itertools import chain
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from blog.constants import API_POSTS_MAX_LIMIT, CURSOR, POSTS_NUMBER_LIMIT
+from blog.models import Post
+from blog.paginators import KeysetPaginator
+
+# Поле ответа -> колонки, которые для него выбираются из базы.
+POST_FIELDS = {
+    'id': ('id',),
+    'title': ('title',),
+    'text': ('text',),
+    'pub_date': ('pub_date',),
+    'image': ('image',),
+    'comment_count': ('comment_count',),
+    'author': ('author__username',),
+    'category': ('category__slug', 'category__title'),
+    'location': ('location__name', 'location__is_published'),
+}
+KEY_COLUMNS = ('pub_date', 'id')
+
+
+def error(message):
+    return JsonResponse({'error': message}, status=400)
+
+
+def serialize_post(row, fields, storage):
+    """Словарь для JSON из строки values() — без экземпляров моделей."""
+    data = {}
+    for field in fields:
+        if field == 'author':
+            data[field] = {'username': row['author__username']}
+        elif field == 'category':
+            data[field] = {
+                'slug': row['category__slug'],
+                'title': row['category__title'],
+            }
+        elif field == 'location':
+            data[field] = (
+                {'name': row['location__name']}
+                if row['location__is_published'] else None
+            )
+        elif field == 'image':
+            data[field] = storage.url(row['image']) if row['image'] else None
+        else:
+            data[field] = row[field]
+    return data
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query[CURSOR] = cursor
+    return request.build_absolute_uri(f'?{query.urlencode()}')
+
+
+@require_GET
+def post_list(request):
+    """Опубликованные публикации в JSON с пагинацией по курсору.
+
+    Параметры: fields — поля через запятую, limit, category (slug),
+    author (username), cursor — из ссылок next/previous ответа.
+    """
+    fields = request.GET.get('fields')
+    fields = list(dict.fromkeys(fields.split(','))) if fields else list(
+        POST_FIELDS)
+    unknown = set(fields) - set(POST_FIELDS)
+    if unknown:
+        return error(f'Неизвестные поля: {", ".join(sorted(unknown))}.')
+    try:
+        limit = int(request.GET.get('limit', POSTS_NUMBER_LIMIT))
+    except ValueError:
+        return error('limit должен быть числом.')
+    limit = max(1, min(limit, API_POSTS_MAX_LIMIT))
+
+    posts = Post.objects.published()
+    if 'category' in request.GET:
+        posts = posts.filter(category__slug=request.GET['category'])
+    if 'author' in request.GET:
+        posts = posts.filter(author__username=request.GET['author'])
+    columns = dict.fromkeys(
+        chain(KEY_COLUMNS, *(POST_FIELDS[field] for field in fields)))
+    page = KeysetPaginator(posts.values(*columns), limit).get_page(
+        request.GET.get(CURSOR))
+    storage = Post._meta.get_field('image').storage
+    return JsonResponse(
+        {
+            'results': [
+                serialize_post(row, fields, storage) for row in page
+            ],
+            'next': page_url(request, page.next_cursor),
+            'previous': page_url(request, page.previous_cursor),
+        },
+        json_dumps_params={'ensure_ascii': False},
+    )
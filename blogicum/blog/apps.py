@@ -5,3 +5,11 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.conf import settings
+
+        from blog import checks, signals  # noqa: F401
+        from blog.warmup import warm_templates
+        if settings.TEMPLATE_WARMUP:
+            warm_templates()
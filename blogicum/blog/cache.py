@@ -0,0 +1,297 @@
+import hashlib
+import math
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from blog.constants import (
+    COMMENTS_CURSOR,
+    CURSOR,
+    PAGE_NUMBER,
+    FEED_COUNT_TIMEOUT,
+    POST_CARD_CACHE_TIMEOUT,
+)
+from blog.models import Category, Post, User
+
+PAGE_KEY_PARAMS = (PAGE_NUMBER, CURSOR, COMMENTS_CURSOR)
+SCHEDULE_KEY = 'blog:schedule:next'
+NOTHING_SCHEDULED = 'nothing'
+
+post_card_stats = Counter()
+page_cache_stats = Counter()
+
+
+def generation_key(kind, pk):
+    return f'blog:generation:{kind}:{pk}'
+
+
+def bump_generation(kind, pk, using=None):
+    """Сделать недействительными все записи, зависящие от объекта."""
+    (using or cache).set(generation_key(kind, pk), time.time_ns(), None)
+
+
+def get_generations(*keys, using=None):
+    """Текущие поколения объектов; отсутствующие создаются заново.
+
+    Новое поколение вместо нуля гарантирует, что после вытеснения
+    ключа из кэша не оживут записи, собранные до вытеснения.
+    """
+    using = using or cache
+    generations = using.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in generations}
+    if missing:
+        using.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def render_post_card(post):
+    """HTML карточки публикации из кэша или свежеотрисованный."""
+    generations = get_generations(
+        generation_key('post', post.pk),
+        generation_key('user', post.author_id),
+        generation_key('category', post.category_id),
+        generation_key('location', post.location_id),
+    )
+    key = 'blog:post_card:{}:{}'.format(
+        post.pk, '.'.join(map(str, generations)))
+    html = cache.get(key)
+    if html is not None:
+        post_card_stats['hits'] += 1
+        return html
+    post_card_stats['misses'] += 1
+    html = render_to_string('includes/post_card.html', {'post': post})
+    cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def purge_pages(*tags):
+    """Сбросить страницы, помеченные любым из тегов."""
+    page_cache = get_page_cache()
+    for tag in tags:
+        bump_generation('tag', tag, using=page_cache)
+
+
+def post_page_tags(post_ids=(), category_ids=(), author_ids=()):
+    """Теги страниц, на которых выводятся данные публикаций."""
+    category_ids = set(category_ids) - {None}
+    author_ids = set(author_ids) - {None}
+    return (
+        ['index']
+        + [f'post:{pk}' for pk in post_ids]
+        + [f'category:{slug}' for slug in Category.objects.filter(
+            pk__in=category_ids).values_list('slug', flat=True)]
+        + [f'profile:{username}' for username in User.objects.filter(
+            pk__in=author_ids).values_list('username', flat=True)]
+    )
+
+
+def next_scheduled_publication():
+    """Время ближайшей отложенной публикации или None."""
+    page_cache = get_page_cache()
+    scheduled = page_cache.get(SCHEDULE_KEY)
+    if scheduled is None:
+        scheduled = Post.objects.filter(
+            is_published=True,
+            pub_date__gt=timezone.now(),
+        ).order_by('pub_date').values_list(
+            'pub_date', flat=True).first() or NOTHING_SCHEDULED
+        page_cache.set(SCHEDULE_KEY, scheduled, None)
+    return None if scheduled == NOTHING_SCHEDULED else scheduled
+
+
+def forget_schedule():
+    get_page_cache().delete(SCHEDULE_KEY)
+
+
+def release_scheduled_posts():
+    """Сбросить страницы отложенных публикаций, время которых наступило.
+
+    Возвращает время жизни страниц в кэше: не дольше, чем до выхода
+    следующей отложенной публикации, поэтому в остальное время
+    страницы могут храниться часами.
+    """
+    now = timezone.now()
+    scheduled = next_scheduled_publication()
+    if scheduled is not None and scheduled <= now:
+        released = Post.objects.filter(
+            is_published=True,
+            pub_date__gte=scheduled,
+            pub_date__lte=now,
+        ).values_list('pk', 'category_id', 'author_id')
+        category_ids = {category_id for _, category_id, _ in released}
+        purge_pages(*post_page_tags(
+            post_ids=[pk for pk, _, _ in released],
+            category_ids=category_ids,
+            author_ids=[author_id for _, _, author_id in released],
+        ))
+        forget_feed_counts(
+            'index', *(f'category:{pk}' for pk in category_ids))
+        forget_schedule()
+        scheduled = next_scheduled_publication()
+    if scheduled is None:
+        return settings.PAGE_CACHE_TIMEOUT
+    return max(1, min(
+        settings.PAGE_CACHE_TIMEOUT,
+        math.ceil((scheduled - now).total_seconds()),
+    ))
+
+
+def feed_count_key(feed):
+    return f'blog:feed_count:{feed}'
+
+
+def get_feed_count(feed, compute):
+    """Число записей ленты из кэша; при промахе считается compute().
+
+    Ленты: 'index', 'category:<id>', 'author:<id>'. Счётчики хранятся
+    в кэше страниц и поправляются adjust_feed_counts() при изменении
+    публикаций. Точны они только с атомарным incr (memcached).
+    С LocMemCache (профили dev и test) у каждого процесса свои
+    счётчики и поправки из других процессов до них не доходят,
+    а FileBasedCache.incr — это get и set, и одновременные поправки
+    теряются. В обоих случаях число в пагинаторе может отставать
+    от базы, но не дольше FEED_COUNT_TIMEOUT: затем счётчик
+    пересчитывается запросом COUNT.
+    """
+    page_cache = get_page_cache()
+    key = feed_count_key(feed)
+    count = page_cache.get(key)
+    if count is None:
+        count = compute()
+        page_cache.set(key, count, FEED_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_feed_counts(deltas):
+    page_cache = get_page_cache()
+    for feed, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            page_cache.incr(feed_count_key(feed), delta)
+        except ValueError:
+            # Счётчик ещё не посчитан — его посчитают при чтении.
+            pass
+
+
+def forget_feed_counts(*feeds):
+    get_page_cache().delete_many([feed_count_key(feed) for feed in feeds])
+
+
+def is_anonymous_request(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def page_cache_key(request, tags):
+    generations = get_generations(
+        *(generation_key('tag', tag) for tag in tags),
+        using=get_page_cache(),
+    )
+    params = [
+        (name, request.GET.get(name))
+        for name in PAGE_KEY_PARAMS if name in request.GET
+    ]
+    digest = hashlib.md5(
+        repr((request.path, params, generations)).encode()
+    ).hexdigest()
+    return f'blog:page:{digest}'
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not response.streaming
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+def cache_anonymous_page(get_tags):
+    """Кэшировать страницу для анонимных посетителей.
+
+    get_tags получает аргументы представления и возвращает теги
+    страницы; purge_pages(tag) сбрасывает все страницы с этим тегом.
+    Запросы с cookie сессии (авторизованные) кэш обходят.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_anonymous_request(request):
+                return view(request, *args, **kwargs)
+            page_cache = get_page_cache()
+            timeout = release_scheduled_posts()
+            key = page_cache_key(request, get_tags(*args, **kwargs))
+            response = page_cache.get(key)
+            if response is not None:
+                page_cache_stats['hits'] += 1
+                return response
+            page_cache_stats['misses'] += 1
+            response = view(request, *args, **kwargs)
+            if not is_cacheable_response(response):
+                return response
+
+            def store(response):
+                page_cache.set(key, response, timeout)
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(get_tags):
+    """Отдавать 304 по ETag/Last-Modified, не выполняя представление.
+
+    Время изменения страницы — самое новое из поколений её тегов:
+    они обновляются при любом изменении данных страницы, в том числе
+    при выходе отложенной публикации. Поколения лежат в кэше страниц,
+    поэтому проверка не делает запросов к базе и не удорожает
+    попадание в кэш страниц. ETag учитывает пользователя, так как
+    страница для него выглядит по-своему, а для авторизованных ещё
+    и cookie CSRF: в их страницах есть формы с токеном, а вход
+    меняет токен, и страница из кэша браузера получила бы 403.
+    """
+    def last_modified(request, *args, **kwargs):
+        if not hasattr(request, 'blog_last_modified'):
+            release_scheduled_posts()
+            generations = get_generations(
+                *(generation_key('tag', tag)
+                  for tag in get_tags(*args, **kwargs)),
+                using=get_page_cache(),
+            )
+            request.blog_last_modified = datetime.fromtimestamp(
+                max(generations) / 10 ** 9, tz=dt_timezone.utc)
+        return request.blog_last_modified
+
+    def etag(request, *args, **kwargs):
+        modified = last_modified(request, *args, **kwargs)
+        csrf_cookie = ''
+        if not is_anonymous_request(request):
+            # get_token создаёт cookie, если его ещё нет: страница
+            # отрисуется с тем же токеном, что вошёл в ETag.
+            get_token(request)
+            csrf_cookie = request.META['CSRF_COOKIE']
+        return hashlib.md5(
+            f'{modified.isoformat()}:{request.user.pk}:{csrf_cookie}'.encode()
+        ).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.checks import Error, Tags, Warning, register
+from django.template import engines
+from django.utils.module_loading import import_string
+
+from blog.warmup import warm_templates
+
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+CACHED_SESSIONS = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+FILE_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+GZIP_MIDDLEWARE = 'django.middleware.gzip.GZipMiddleware'
+HINT = 'Запускайте сервер с BLOGICUM_PROFILE=prod.'
+
+W001 = Warning(
+    'DEBUG включён: Django хранит в памяти каждый выполненный '
+    'SQL-запрос.',
+    hint=HINT,
+    id='blog.W001',
+)
+W004 = Warning(
+    'Сессии читаются из базы на каждый запрос.',
+    hint="SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'.",
+    id='blog.W004',
+)
+W005 = Warning(
+    'Шаблоны читаются и разбираются заново при каждой отрисовке.',
+    hint=f'Используйте {CACHED_LOADER} в TEMPLATES.',
+    id='blog.W005',
+)
+W006 = Warning(
+    'Ответы отдаются без сжатия.',
+    hint=f'Добавьте {GZIP_MIDDLEWARE} в MIDDLEWARE.',
+    id='blog.W006',
+)
+W007 = Warning(
+    'Статические файлы отдаются без хеша в имени: браузеры не могут '
+    'кешировать их надолго.',
+    hint='STATICFILES_STORAGE = '
+    "'blogicum.staticfiles.CompressedManifestStaticFilesStorage'.",
+    id='blog.W007',
+)
+W008 = Warning(
+    'Включён профилировщик шаблонов: каждый тег и фильтр замеряется.',
+    hint='Уберите BLOGICUM_TEMPLATE_PROFILE из окружения.',
+    id='blog.W008',
+)
+
+
+@register(Tags.templates)
+def check_templates_compile(app_configs, **kwargs):
+    """Каждый шаблон из каталога templates/ компилируется."""
+    compiled, elapsed, failed = warm_templates()
+    return [
+        Error(
+            f'Шаблон {name} не компилируется: {error}',
+            hint='Исправьте синтаксис шаблона или подключаемые библиотеки.',
+            obj=name,
+            id='blog.E001',
+        )
+        for name, error in failed
+    ]
+
+
+@register('performance', deploy=True)
+def check_debug(app_configs, **kwargs):
+    return [W001] if settings.DEBUG else []
+
+
+@register('performance', deploy=True)
+def check_persistent_connections(app_configs, **kwargs):
+    return [
+        Warning(
+            f'База {alias} открывает новое соединение на каждый запрос.',
+            hint='Задайте CONN_MAX_AGE (BLOGICUM_CONN_MAX_AGE).',
+            obj=alias,
+            id='blog.W002',
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get('CONN_MAX_AGE')
+    ]
+
+
+@register('performance', deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    return [
+        Warning(
+            f'Кеш {alias} живёт в памяти одного процесса: воркеры не '
+            'видят сброс поколений и страниц друг друга.',
+            hint='Используйте файловый кеш или memcached '
+            '(BLOGICUM_CACHE_DIR, BLOGICUM_MEMCACHED).',
+            obj=alias,
+            id='blog.W003',
+        )
+        for alias in ('default', settings.PAGE_CACHE_ALIAS)
+        if settings.CACHES[alias]['BACKEND'] in LOCAL_CACHES
+    ]
+
+
+@register('performance', deploy=True)
+def check_cached_sessions(app_configs, **kwargs):
+    return [] if settings.SESSION_ENGINE in CACHED_SESSIONS else [W004]
+
+
+@register('performance', deploy=True)
+def check_cached_templates(app_configs, **kwargs):
+    loaders = engines['django'].engine.loaders
+    cached = all(
+        isinstance(loader, (list, tuple)) and loader[0] == CACHED_LOADER
+        for loader in loaders
+    )
+    return [] if cached else [W005]
+
+
+@register('performance', deploy=True)
+def check_gzip(app_configs, **kwargs):
+    return [] if GZIP_MIDDLEWARE in settings.MIDDLEWARE else [W006]
+
+
+@register('performance', deploy=True)
+def check_static_storage(app_configs, **kwargs):
+    storage = import_string(settings.STATICFILES_STORAGE)
+    return [] if issubclass(storage, ManifestFilesMixin) else [W007]
+
+
+@register('performance', deploy=True)
+def check_template_profiler(app_configs, **kwargs):
+    return [W008] if settings.TEMPLATE_PROFILE else []
+
+
+@register('performance', deploy=True)
+def check_file_cache_limits(app_configs, **kwargs):
+    return [
+        Warning(
+            f'Файловый кеш {alias} без MAX_ENTRIES: после 300 записей '
+            'он удаляет случайную треть, включая ключи поколений.',
+            hint='Задайте OPTIONS MAX_ENTRIES по размеру корпуса '
+            '(BLOGICUM_CACHE_MAX_ENTRIES) или используйте memcached.',
+            obj=alias,
+            id='blog.W009',
+        )
+        for alias, config in settings.CACHES.items()
+        if config['BACKEND'] == FILE_CACHE
+        and 'MAX_ENTRIES' not in config.get('OPTIONS', {})
+    ]
+
+
+@register('performance', deploy=True)
+def check_file_cache_writes(app_configs, **kwargs):
+    """FileBasedCache перед каждой записью перечисляет свой каталог,
+    чтобы решить, пора ли отсекать записи."""
+    return [
+        Warning(
+            f'Файловый кеш {alias} перечисляет до MAX_ENTRIES файлов '
+            'при каждой записи: запись карточек, страниц и поколений '
+            'дорожает с ростом кеша.',
+            hint='Задайте BLOGICUM_MEMCACHED: общие кеши переедут '
+            'в memcached.',
+            obj=alias,
+            id='blog.W010',
+        )
+        for alias, config in settings.CACHES.items()
+        if config['BACKEND'] == FILE_CACHE
+    ]
@@ -1,2 +1,18 @@
 POSTS_NUMBER_LIMIT = 10
 PAGE_NUMBER = 'page'
+CURSOR = 'cursor'
+COMMENTS_NUMBER_LIMIT = 50
+COMMENTS_CURSOR = 'comments_cursor'
+FEED_ORDERING = ('-pub_date', '-id')
+COMMENTS_ORDERING = ('created_at', 'id')
+POST_PREVIEW_LENGTH = 300
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_COUNT_TIMEOUT = 60 * 60
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+POST_IMAGE_THUMB_WIDTH = 640
+POST_IMAGE_QUALITY = 80
+JOB_RETRY_DELAY = 30
+JOB_STALE_TIMEOUT = 60 * 10
+JOB_POLL_INTERVAL = 1
+API_POSTS_MAX_LIMIT = 100
+EXPORT_CHUNK_SIZE = 2000
@@ -0,0 +1,85 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.models import Category, Comment, Location, Post
+
+EXPORT_MODELS = {
+    'category': (Category, ('id', 'title', 'description', 'slug',
+                            'is_published', 'created_at')),
+    'location': (Location, ('id', 'name', 'is_published', 'created_at')),
+    'post': (Post, ('id', 'title', 'text', 'pub_date', 'author_id',
+                    'location_id', 'category_id', 'image', 'comment_count',
+                    'is_published', 'created_at')),
+    'comment': (Comment, ('id', 'text', 'post_id', 'author_id',
+                          'is_published', 'created_at')),
+}
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку, а не пишет её."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(name, queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки модели порциями: iterator() не кэширует выборку, а на
+    PostgreSQL читает её серверным курсором."""
+    model, columns = EXPORT_MODELS[name]
+    if queryset is None:
+        queryset = model.objects.all()
+    return queryset.order_by('pk').values_list(*columns).iterator(
+        chunk_size=chunk_size)
+
+
+def ndjson_lines(name, rows):
+    _, columns = EXPORT_MODELS[name]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode({'model': name, **dict(zip(columns, row))})
+        yield '\n'
+
+
+def csv_lines(name, rows):
+    _, columns = EXPORT_MODELS[name]
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+
+
+def export_lines(names, export_format, querysets=None,
+                 chunk_size=EXPORT_CHUNK_SIZE):
+    """Текст выгрузки по кусочкам. CSV — только для одной модели."""
+    if export_format == 'csv' and len(names) != 1:
+        raise ValueError('CSV export supports a single model.')
+    querysets = querysets or {}
+    for name in names:
+        rows = iter_rows(name, querysets.get(name), chunk_size)
+        if export_format == 'csv':
+            yield from csv_lines(name, rows)
+        else:
+            yield from ndjson_lines(name, rows)
+
+
+def streaming_export(name, export_format, queryset=None):
+    """StreamingHttpResponse с выгрузкой одной модели."""
+    response = StreamingHttpResponse(
+        export_lines([name], export_format, {name: queryset}),
+        content_type=FORMATS[export_format],
+    )
+    filename = '{}-{}.{}'.format(
+        name, timezone.now().strftime('%Y%m%d-%H%M%S'), export_format)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,223 @@
+import logging
+import os
+import posixpath
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from blog.constants import (
+    POST_IMAGE_QUALITY,
+    POST_IMAGE_THUMB_WIDTH,
+    POST_IMAGE_WIDTHS,
+)
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+}
+
+
+def variant_name(name, width, ext):
+    """post_images/cat.png -> post_images/variants/cat.png.640w.webp"""
+    directory, filename = posixpath.split(name)
+    return posixpath.join(
+        directory, VARIANTS_DIR, f'{filename}.{width}w.{ext}')
+
+
+def source_name(name):
+    """Имя исходного файла для имени уменьшенной копии или None."""
+    directory, filename = posixpath.split(name)
+    parent, variants_dir = posixpath.split(directory)
+    parts = filename.rsplit('.', 2)
+    if (variants_dir != VARIANTS_DIR or len(parts) != 3
+            or parts[2] not in VARIANT_FORMATS
+            or not parts[1].endswith('w')):
+        return None
+    return posixpath.join(parent, parts[0])
+
+
+def variant_widths(source_width=None):
+    """Ширины копий изображения шириной source_width.
+
+    Копии не бывают шире исходника: вместо ширин от исходной и больше
+    делается одна копия исходной ширины. Пока ширина неизвестна
+    (None), считается, что исходник шире всех POST_IMAGE_WIDTHS.
+    """
+    if not source_width:
+        return POST_IMAGE_WIDTHS
+    widths = tuple(
+        width for width in POST_IMAGE_WIDTHS if width < source_width)
+    if source_width <= POST_IMAGE_WIDTHS[-1]:
+        widths += (source_width,)
+    return widths
+
+
+def thumb_width(source_width=None):
+    return min(POST_IMAGE_THUMB_WIDTH,
+               source_width or POST_IMAGE_THUMB_WIDTH)
+
+
+def variant_names(name, source_width=None):
+    return [
+        variant_name(name, width, ext)
+        for width in variant_widths(source_width) for ext in VARIANT_FORMATS
+    ]
+
+
+def _encode(image, width, image_format):
+    copy = image.copy()
+    if width < copy.width:
+        copy = copy.resize(
+            (width, max(1, round(copy.height * width / copy.width))),
+            Image.LANCZOS,
+        )
+    if image_format == 'JPEG' and copy.mode not in ('RGB', 'L'):
+        copy = copy.convert('RGB')
+    buffer = BytesIO()
+    copy.save(buffer, image_format, quality=POST_IMAGE_QUALITY,
+              optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(name, storage=default_storage):
+    """Сохранить уменьшенные копии изображения в WebP и JPEG.
+
+    Копии пересжимаются без метаданных (в том числе EXIF)
+    и кладутся в подкаталог variants рядом с исходным файлом.
+    Возвращает ширину исходного изображения и имена сохранённых
+    файлов; (None, []), если изображение не читается.
+    """
+    try:
+        with storage.open(name) as file:
+            image = ImageOps.exif_transpose(Image.open(file))
+            image.load()
+    except (OSError, UnidentifiedImageError) as error:
+        logger.warning('Cannot read image %s: %s', name, error)
+        return None, []
+    marker = variant_name(name, thumb_width(image.width), 'jpg')
+    # Копия-маркер сохраняется последней: по ней шаблоны решают,
+    # что набор копий готов.
+    targets = sorted(
+        ((width, ext) for width in variant_widths(image.width)
+         for ext in VARIANT_FORMATS),
+        key=lambda target: variant_name(name, *target) == marker,
+    )
+    saved = []
+    for width, ext in targets:
+        target = variant_name(name, width, ext)
+        content = ContentFile(_encode(image, width, VARIANT_FORMATS[ext]))
+        if storage.exists(target):
+            storage.delete(target)
+        saved.append(storage.save(target, content))
+    return image.width, saved
+
+
+def replace_file(name, content, storage):
+    """Атомарно заменить файл хранилища; False, если у хранилища нет
+    локальных путей.
+
+    Новое содержимое пишется во временный файл рядом и подменяет
+    старое через os.replace: читатели видят либо старый файл, либо
+    новый, а при ошибке записи старый остаётся на месте.
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        return False
+    descriptor, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix='.strip-')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.chmod(temporary, getattr(storage, 'file_permissions_mode', None)
+                 or 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return True
+
+
+def strip_metadata(name, storage=default_storage):
+    """Пересохранить исходный файл без EXIF (координаты, модель камеры).
+
+    Ориентация из EXIF применяется к пикселям заранее. Возвращает
+    имя файла без метаданных: name, если файл заменён на месте или
+    метаданных не было, иначе новое имя — поле Post.image нужно
+    перевести на него.
+    """
+    try:
+        with storage.open(name) as file:
+            image = Image.open(file)
+            image_format = image.format
+            if not image.getexif() and 'exif' not in image.info:
+                return name
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, UnidentifiedImageError) as error:
+        logger.warning('Cannot read image %s: %s', name, error)
+        return name
+    image.info.pop('exif', None)
+    options = {'quality': 95} if image_format == 'JPEG' else {}
+    buffer = BytesIO()
+    image.save(buffer, image_format, exif=b'', **options)
+    if replace_file(name, buffer.getvalue(), storage):
+        return name
+    # Удалённые хранилища не умеют подменять файл: исходный остаётся
+    # доступен, пока публикация не переведена на новое имя.
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def delete_variants(name, storage=default_storage, source_width=None):
+    for target in variant_names(name, source_width):
+        if storage.exists(target):
+            storage.delete(target)
+
+
+class ImageVariants:
+    """URL уменьшенных копий для шаблонов."""
+
+    def __init__(self, name, storage=default_storage, source_width=None):
+        self.name = name
+        self.storage = storage
+        self.source_width = source_width
+
+    def url(self, width, ext):
+        return self.storage.url(variant_name(self.name, width, ext))
+
+    def srcset(self, ext):
+        return ', '.join(
+            f'{self.url(width, ext)} {width}w'
+            for width in variant_widths(self.source_width)
+        )
+
+    @property
+    def thumb_url(self):
+        return self.url(thumb_width(self.source_width), 'jpg')
+
+    @property
+    def webp_srcset(self):
+        return self.srcset('webp')
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset('jpg')
+
+
+def get_variants(image, source_width=None):
+    """ImageVariants для поля изображения или None, если копий ещё нет.
+
+    source_width — Post.image_width, его записывает фоновая задача.
+    """
+    if not image:
+        return None
+    marker = variant_name(image.name, thumb_width(source_width), 'jpg')
+    if not image.storage.exists(marker):
+        return None
+    return ImageVariants(image.name, image.storage, source_width)
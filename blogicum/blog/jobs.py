@@ -0,0 +1,173 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from blog.cache import bump_generation, post_page_tags, purge_pages
+from blog.constants import JOB_RETRY_DELAY, JOB_STALE_TIMEOUT
+from blog.images import delete_variants, generate_variants, strip_metadata
+from blog.models import Job, Post
+
+logger = logging.getLogger(__name__)
+
+handlers = {}
+
+
+def job(func):
+    """Зарегистрировать обработчик задачи под именем функции."""
+    handlers[func.__name__] = func
+    return func
+
+
+def enqueue(handler_name, **payload):
+    """Поставить задачу в очередь; выполнит её manage.py run_worker.
+
+    Строка задачи пишется в текущей транзакции: представления
+    публикаций атомарны, поэтому при откате не остаётся задач-сирот,
+    а воркер не увидит задачу раньше изменённых данных.
+    """
+    if handler_name not in handlers:
+        raise ValueError(f'Unknown job: {handler_name}')
+    return Job.objects.create(name=handler_name, payload=payload)
+
+
+def claim(limit=1):
+    """Забрать из очереди до limit задач, готовых к запуску.
+
+    Задача достаётся тому, чей UPDATE по статусу pending изменил
+    строку, поэтому несколько воркеров не выполнят её дважды.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING,
+        run_after__lte=now,
+    ).order_by('run_after', 'id').values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        if Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def execute(pk):
+    """Выполнить захваченную задачу и записать результат.
+
+    Упавшая задача возвращается в очередь с экспоненциальной
+    задержкой, пока не исчерпает max_attempts.
+    """
+    job = Job.objects.get(pk=pk)
+    try:
+        handlers[job.name](**job.payload)
+    except Exception:
+        logger.exception('Job %s failed', job)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=(
+        'status', 'last_error', 'run_after', 'finished_at'))
+    return job.status
+
+
+def run_job(pk):
+    """execute() для пула потоков или процессов воркера."""
+    try:
+        return execute(pk)
+    finally:
+        connections.close_all()
+
+
+def run_pending():
+    """Выполнить все готовые задачи в текущем потоке."""
+    statuses = []
+    while True:
+        claimed = claim()
+        if not claimed:
+            return statuses
+        statuses.append(execute(claimed[0]))
+
+
+def requeue_stale():
+    """Вернуть в очередь задачи, воркер которых умер посреди работы."""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=now - timedelta(seconds=JOB_STALE_TIMEOUT),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        finished_at=now,
+        last_error='Воркер остановился, не завершив задачу.',
+    )
+    return stale.update(status=Job.PENDING, run_after=now)
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+@job
+def process_post_image(post_id, name):
+    """Убрать EXIF из загруженного файла и нарезать уменьшенные копии.
+
+    Кэш карточек и страниц сбрасывается из процесса воркера, поэтому
+    он должен быть общим с веб-сервером (профиль prod: файловый кэш
+    или memcached). С LocMemCache воркер сбросит только свою память,
+    и новые копии появятся на страницах по истечении их срока.
+    """
+    post = Post.objects.filter(pk=post_id, image=name).values(
+        'category_id', 'author_id').first()
+    if post is None:
+        # Публикацию удалили или сменили ей изображение.
+        return
+    storage = image_storage()
+    stripped = strip_metadata(name, storage)
+    if stripped != name:
+        if not Post.objects.filter(pk=post_id, image=name).update(
+                image=stripped):
+            storage.delete(stripped)
+            return
+        storage.delete(name)
+        name = stripped
+    width, _ = generate_variants(name, storage)
+    if width is not None:
+        # Все ширины больше POST_IMAGE_WIDTHS[-1] для копий равноценны,
+        # а поле ширины не вмещает больше 32767.
+        width = min(width, 32767)
+    Post.objects.filter(pk=post_id, image=name).update(image_width=width)
+    bump_generation('post', post_id)
+    purge_pages(*post_page_tags(
+        post_ids=[post_id],
+        category_ids=[post['category_id']],
+        author_ids=[post['author_id']],
+    ))
+
+
+@job
+def delete_post_image(name, width=None):
+    """Удалить файл, на который больше не ссылается ни одна публикация.
+
+    width — ширина исходника (Post.image_width): по ней известны
+    имена копий.
+    """
+    if Post.objects.filter(image=name).exists():
+        return
+    storage = image_storage()
+    delete_variants(name, storage, width)
+    if storage.exists(name):
+        storage.delete(name)
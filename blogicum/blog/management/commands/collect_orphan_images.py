@@ -0,0 +1,117 @@
+import os
+import shutil
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.images import source_name
+from blog.models import Post
+
+
+def scan(directory, root, cutoff, exclude=None):
+    """Файлы каталога и подкаталогов старше cutoff, по одному.
+
+    os.scandir не собирает каталог в список, поэтому память
+    не зависит от числа файлов.
+    """
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if Path(entry.path).resolve() != exclude:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime < cutoff:
+                        name = Path(entry.path).relative_to(root).as_posix()
+                        yield name, stat.st_size, entry.path
+
+
+def referenced(names, chunk_size):
+    """Имена из names, на которые ссылается Post.image."""
+    return set(
+        Post.objects.filter(image__in=names).order_by().values_list(
+            'image', flat=True).distinct().iterator(chunk_size=chunk_size)
+    )
+
+
+class Command(BaseCommand):
+    help = ('Удаляет или переносит в карантин изображения из MEDIA_ROOT, '
+            'на которые не ссылается ни одна публикация, вместе с их '
+            'уменьшенными копиями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать файлы-сироты.')
+        parser.add_argument('--quarantine',
+                            help='Каталог, куда переносить файлы '
+                            'вместо удаления.')
+        parser.add_argument('--min-age', type=int, default=60 * 60,
+                            help='Не трогать файлы моложе стольких секунд: '
+                            'их может сохранять запрос прямо сейчас.')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Сколько файлов сверять с базой за раз.')
+
+    def handle(self, *args, **options):
+        root = Path(settings.MEDIA_ROOT).resolve()
+        top = root / settings.POST_IMAGES_UPLOAD_PATH
+        if not top.is_dir():
+            raise CommandError(f'Каталог {top} не найден.')
+        quarantine = options['quarantine']
+        if quarantine:
+            quarantine = Path(quarantine).resolve()
+        files = scan(top, root, time.time() - options['min_age'], quarantine)
+        found = size = 0
+        while True:
+            chunk = list(islice(files, options['chunk_size']))
+            if not chunk:
+                break
+            for name, file_size in self.collect_chunk(
+                    chunk, quarantine, options):
+                found += 1
+                size += file_size
+                if options['verbosity'] > 1:
+                    self.stdout.write(name)
+        summary = f'{found} ({size / 2 ** 20:.1f} МБ).'
+        if options['dry_run']:
+            self.stdout.write(f'Найдено файлов-сирот: {summary}')
+        elif quarantine:
+            self.stdout.write(self.style.SUCCESS(
+                f'Перенесено в карантин файлов: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Удалено файлов: {summary}'))
+
+    def collect_chunk(self, chunk, quarantine, options):
+        """Сироты из порции файлов; без --dry-run они сразу убираются."""
+        sources = {name: source_name(name) or name for name, _, _ in chunk}
+        alive = referenced(set(sources.values()), options['chunk_size'])
+        orphans = [item for item in chunk if sources[item[0]] not in alive]
+        if orphans and not options['dry_run']:
+            # Публикация могла получить файл, пока шла сверка:
+            # перепроверяем всю порцию одним запросом перед удалением.
+            alive = referenced(
+                {sources[name] for name, _, _ in orphans},
+                options['chunk_size'],
+            )
+        for name, file_size, path in orphans:
+            if sources[name] in alive:
+                continue
+            if options['dry_run'] or self.collect(path, name, quarantine):
+                yield name, file_size
+
+    def collect(self, path, name, quarantine):
+        try:
+            if quarantine:
+                target = quarantine / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,119 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.constants import (
+    COMMENTS_NUMBER_LIMIT,
+    COMMENTS_ORDERING,
+    POSTS_NUMBER_LIMIT,
+)
+from blog.models import Category, Comment, Post
+from blog.paginators import FORWARD, KeysetPaginator
+
+User = get_user_model()
+
+FULL_SCAN_PATTERNS = (
+    # SQLite: «SCAN blog_post» без использования индекса.
+    re.compile(r'\bSCAN (?:TABLE )?(blog_\w+)\b(?!.*\bUSING\b)'),
+    # PostgreSQL.
+    re.compile(r'\bSeq Scan on (blog_\w+)'),
+)
+# Сортировка всей выборки: индекс не отдаёт строки в порядке ленты,
+# и страница стоит тем дороже, чем длиннее лента.
+SORT_PATTERNS = (
+    # SQLite.
+    re.compile(r'\b(USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY)'),
+    # PostgreSQL.
+    re.compile(r'^[\s>-]*((?:Incremental )?Sort)\b', re.MULTILINE),
+)
+
+
+def plan_problems(plan):
+    """Полные просмотры таблиц блога и сортировки в плане запроса."""
+    return [
+        match for pattern in FULL_SCAN_PATTERNS + SORT_PATTERNS
+        for match in pattern.findall(plan)
+    ]
+
+
+def pages(name, paginator):
+    """Запросы первой страницы и страницы по курсору, как у представлений."""
+    queries = {name: paginator.page_queryset()}
+    first = paginator.object_list.first()
+    if first is not None:
+        queries[f'{name}.cursor'] = paginator.page_queryset(
+            *paginator.decode_cursor(
+                paginator.encode_cursor(FORWARD, first)))
+    return queries
+
+
+class Command(BaseCommand):
+    help = ('Выводит планы выполнения (EXPLAIN) запросов, '
+            'которые выполняют страницы ленты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category',
+                            help='slug категории для category_posts.')
+        parser.add_argument('--author',
+                            help='username автора для профиля.')
+        parser.add_argument('--post', type=int,
+                            help='id публикации для post_detail.')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Выполнить EXPLAIN ANALYZE, если '
+                            'СУБД его поддерживает.')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Завершиться с ошибкой, если в плане '
+                            'есть полный просмотр таблицы блога '
+                            'или сортировка.')
+
+    def get_queries(self, options):
+        """Запросы, которые выполняют представления blog.views."""
+        category = Category.objects.filter(is_published=True)
+        if options['category']:
+            category = category.filter(slug=options['category'])
+        author = User.objects.order_by('pk')
+        if options['author']:
+            author = author.filter(username=options['author'])
+        category, author = category.first(), author.first()
+        if category is None or author is None:
+            raise CommandError('Нет категории или автора для примера.')
+        post_id = options['post'] or Post.objects.published().values_list(
+            'pk', flat=True).first()
+        return {
+            **pages('index', KeysetPaginator(
+                Post.objects.published().feed(), POSTS_NUMBER_LIMIT)),
+            **pages('category_posts', KeysetPaginator(
+                category.post.published().feed(), POSTS_NUMBER_LIMIT)),
+            **pages('profile', KeysetPaginator(
+                author.post.feed(), POSTS_NUMBER_LIMIT)),
+            'post_detail': Post.objects.published().with_related().filter(
+                pk=post_id),
+            **pages('post_detail.comments', KeysetPaginator(
+                Comment.objects.thread(post_id), COMMENTS_NUMBER_LIMIT,
+                ordering=COMMENTS_ORDERING)),
+        }
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        full_scans = []
+        for name, queryset in self.get_queries(options).items():
+            try:
+                plan = queryset.explain(**explain_options)
+            except ValueError as error:
+                raise CommandError(error)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan)
+            self.stdout.write('')
+            full_scans.extend(
+                f'{name}: {problem}' for problem in plan_problems(plan))
+        if not full_scans:
+            self.stdout.write(self.style.SUCCESS(
+                'Полных просмотров таблиц блога и сортировок не найдено.'))
+            return
+        message = ('Полный просмотр таблиц или сортировка: '
+                   + ', '.join(full_scans))
+        if options['fail_on_scan']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.export import EXPORT_MODELS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = ('Выгружает публикации, комментарии, категории и местоположения '
+            'в NDJSON или CSV, не загружая таблицы в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*',
+                            help='Что выгружать: {}; по умолчанию всё.'.format(
+                                ', '.join(EXPORT_MODELS)))
+        parser.add_argument('--format', choices=list(FORMATS),
+                            default='ndjson', dest='export_format')
+        parser.add_argument('--output', '-o',
+                            help='Файл для выгрузки; по умолчанию stdout.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE,
+                            help='Сколько строк читать из базы за раз.')
+
+    def handle(self, *args, **options):
+        names = options['models'] or list(EXPORT_MODELS)
+        unknown = set(names) - set(EXPORT_MODELS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные модели: {", ".join(sorted(unknown))}.')
+        if options['export_format'] == 'csv' and len(names) != 1:
+            raise CommandError('Для CSV укажите одну модель.')
+        lines = export_lines(
+            names, options['export_format'],
+            chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,163 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+PASSWORD = 'corpus-password'
+
+
+def power_law(count, alpha, rng):
+    """Накопленные веса Zipf для rng.choices: немногие «горячие»
+    элементы получают большую часть выборок. Порядок перемешан,
+    чтобы горячими были не обязательно первые записи."""
+    weights = [1 / rank ** alpha for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(accumulate(weights))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, публикациями и '
+            'комментариями с реалистичным перекосом для нагрузочных '
+            f'замеров. Пароль всех пользователей: {PASSWORD}.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=12)
+        parser.add_argument('--locations', type=int, default=30)
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель степенного закона для '
+                            'авторов и комментируемых публикаций.')
+        parser.add_argument('--scheduled', type=float, default=0.05,
+                            help='Доля публикаций с датой в будущем.')
+        parser.add_argument('--hidden', type=float, default=0.2,
+                            help='Доля снятых с публикации категорий '
+                            'и местоположений.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int,
+                            help='Зерно для воспроизводимого корпуса.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.create(Category, [
+                Category(
+                    title=self.fake.catch_phrase()[:256],
+                    description=self.fake.paragraph(),
+                    slug=f'corpus-{self.rng.getrandbits(32):08x}-{i}',
+                    is_published=self.visible(),
+                )
+                for i in range(options['categories'])
+            ])
+            locations = self.create(Location, [
+                Location(name=self.fake.city(), is_published=self.visible())
+                for _ in range(options['locations'])
+            ])
+            posts = self.create_posts(users, categories, locations)
+            self.create_comments(users, posts)
+        call_command('reconcile_comment_counts', stdout=self.stdout)
+        # bulk_create не отправляет сигналы, которые сбрасывают кэши.
+        for cache in caches.all():
+            cache.clear()
+
+    def visible(self):
+        return self.rng.random() >= self.options['hidden']
+
+    def batches(self, objects):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.options['batch_size']:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def create(self, model, objects):
+        """bulk_create пачками; возвращает id новых строк.
+
+        SQLite не возвращает id из bulk_create, поэтому они
+        перечитываются: новые строки — всё, что после прежнего
+        наибольшего id.
+        """
+        last = model.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+        created = 0
+        for batch in self.batches(objects):
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural.capitalize()}: {created}')
+        return list(model.objects.filter(pk__gt=last).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        return self.create(User, (
+            User(
+                username=f'{self.fake.user_name()}_{i}'[:150],
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+            )
+            for i in range(count)
+        ))
+
+    def pub_date(self):
+        if self.rng.random() < self.options['scheduled']:
+            return self.now + timedelta(
+                minutes=self.rng.randint(1, 60 * 24 * 30))
+        return self.now - timedelta(
+            minutes=self.rng.randint(0, 60 * 24 * 365))
+
+    def create_posts(self, users, categories, locations):
+        authors = power_law(len(users), self.options['skew'], self.rng)
+        return self.create(Post, (
+            Post(
+                title=self.fake.sentence(nb_words=6)[:256],
+                text='\n\n'.join(self.fake.paragraphs(
+                    nb=self.rng.randint(1, 6))),
+                pub_date=self.pub_date(),
+                author_id=self.rng.choices(users, cum_weights=authors)[0],
+                category_id=self.rng.choice(categories),
+                location_id=(self.rng.choice(locations)
+                             if locations and self.rng.random() < 0.7
+                             else None),
+                is_published=self.rng.random() < 0.95,
+            )
+            for _ in range(self.options['posts'])
+        ))
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return []
+        authors = power_law(len(users), self.options['skew'], self.rng)
+        threads = power_law(len(posts), self.options['skew'], self.rng)
+        return self.create(Comment, (
+            Comment(
+                text=self.fake.sentence(nb_words=self.rng.randint(3, 30)),
+                post_id=self.rng.choices(posts, cum_weights=threads)[0],
+                author_id=self.rng.choices(users, cum_weights=authors)[0],
+                is_published=self.rng.random() < 0.97,
+            )
+            for _ in range(self.options['comments'])
+        ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает Post.comment_count (опубликованные '
+            'комментарии) и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Сколько публикаций проверять за раз.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать расхождения.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        actual = Comment.objects.filter(
+            post=OuterRef('pk'),
+            is_published=True,
+        ).order_by().values('post').annotate(
+            total=Count('pk'),
+        ).values('total')
+        actual = Coalesce(Subquery(actual), 0)
+        bounds = Post.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write('Публикаций нет.')
+            return
+        fixed = 0
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic():
+                drifted = list(
+                    Post.objects.filter(
+                        pk__gte=low, pk__lt=low + batch_size,
+                    ).annotate(
+                        actual=actual,
+                    ).exclude(
+                        comment_count=F('actual'),
+                    ).values_list('pk', flat=True)
+                )
+                if drifted and not options['dry_run']:
+                    Post.objects.filter(pk__in=drifted).update(
+                        comment_count=actual,
+                    )
+            fixed += len(drifted)
+        if options['dry_run']:
+            self.stdout.write(f'Расхождений найдено: {fixed}.')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено публикаций: {fixed}.'))
@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.constants import JOB_POLL_INTERVAL, JOB_STALE_TIMEOUT
+from blog.jobs import claim, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из таблицы blog.Job: обработку '
+            'изображений публикаций и удаление ненужных файлов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Сколько задач выполнять одновременно.')
+        parser.add_argument('--processes', action='store_true',
+                            help='Пул процессов вместо пула потоков.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Завершиться, когда очередь опустеет.')
+        parser.add_argument('--poll-interval', type=float,
+                            default=JOB_POLL_INTERVAL,
+                            help='Пауза между опросами пустой очереди, с.')
+
+    def requeue_stale(self):
+        """Вернуть задачи упавших воркеров; вызывается при старте
+        и затем раз в JOB_STALE_TIMEOUT."""
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь задач: {requeued}.')
+        return time.monotonic() + JOB_STALE_TIMEOUT
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        next_requeue = self.requeue_stale()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        if options['processes']:
+            # spawn ведёт себя одинаково на всех ОС и не копирует
+            # в детей соединения с базой; Django в них настраивается
+            # заново до первой задачи.
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        running = set()
+        finished = 0
+        with pool:
+            try:
+                while True:
+                    if time.monotonic() >= next_requeue:
+                        next_requeue = self.requeue_stale()
+                    claimed = claim(workers - len(running))
+                    running.update(pool.submit(run_job, pk) for pk in claimed)
+                    if not running:
+                        if options['burst']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    done, running = wait(
+                        running,
+                        timeout=options['poll_interval'],
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        future.result()
+                    finished += len(done)
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка: ждём запущенные задачи.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {finished}.'))
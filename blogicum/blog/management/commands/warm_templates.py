@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны из каталога templates/ и сообщает '
+            'о тех, что не компилируются. Кеш загрузчика живёт в '
+            'процессе: для веб-сервера прогрев выполняет '
+            'BlogConfig.ready() при TEMPLATE_WARMUP = True.')
+
+    def handle(self, *args, **options):
+        compiled, elapsed, failed = warm_templates()
+        for name, error in failed:
+            self.stderr.write(f'{name}: {error}')
+        if failed:
+            raise CommandError(
+                f'Не компилируются шаблонов: {len(failed)}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled} '
+            f'за {elapsed * 1000:.0f} мс.'))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+    ]
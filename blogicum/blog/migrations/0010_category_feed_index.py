@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_image_width'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_pub_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-pub_date', '-id'], name='post_category_feed_idx'),
+        ),
+    ]
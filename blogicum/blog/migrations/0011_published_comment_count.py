@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-18 21:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_published_comments(apps, schema_editor):
+    Comment = apps.get_model('blog', 'Comment')
+    Post = apps.get_model('blog', 'Post')
+    counts = Comment.objects.filter(
+        post=OuterRef('pk'),
+        is_published=True,
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    Post.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_category_feed_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Только опубликованные.', verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(count_published_comments,
+                             migrations.RunPython.noop),
+    ]
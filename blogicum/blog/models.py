@@ -1,6 +1,12 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Substr
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from blog.constants import FEED_ORDERING, POST_PREVIEW_LENGTH
+from blog.images import get_variants
 
 
 User = get_user_model()
@@ -52,6 +58,47 @@ class Location(Published):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    """Выборки публикаций для страниц блога"""
+
+    def published(self):
+        return self.filter(
+            pub_date__lte=timezone.now(),
+            is_published=True,
+            category__is_published=True,
+        )
+
+    def with_related(self):
+        return self.select_related(
+            'location',
+            'author',
+            'category',
+        )
+
+    def for_cards(self):
+        """Только поля, которые выводит includes/post_card.html."""
+        return self.with_related().only(
+            'title',
+            'is_published',
+            'pub_date',
+            'image',
+            'image_width',
+            'comment_count',
+            'author__username',
+            'location__name',
+            'location__is_published',
+            'category__title',
+            'category__slug',
+            'category__is_published',
+        ).annotate(
+            text_preview=Substr('text', 1, POST_PREVIEW_LENGTH),
+        )
+
+    def feed(self):
+        """Карточки в порядке лент: новые первыми."""
+        return self.for_cards().order_by(*FEED_ORDERING)
+
+
 class Post(Published):
     """Публикация"""
     title = models.CharField(max_length=256, verbose_name='Заголовок')
@@ -82,15 +129,74 @@ class Post(Published):
                               upload_to=settings.POST_IMAGES_UPLOAD_PATH,
                               blank=True,
                               )
+    comment_count = models.PositiveIntegerField('Количество комментариев',
+                                                default=0,
+                                                editable=False,
+                                                help_text='Только '
+                                                'опубликованные.',
+                                                )
+    image_width = models.PositiveSmallIntegerField('Ширина фото',
+                                                   null=True,
+                                                   blank=True,
+                                                   editable=False,
+                                                   )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('is_published', 'pub_date'),
+                         name='post_published_pub_date_idx',
+                         ),
+            models.Index(fields=('category', '-pub_date', '-id'),
+                         condition=models.Q(is_published=True),
+                         name='post_category_feed_idx',
+                         ),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date_idx',
+                         ),
+            models.Index(fields=('-pub_date', '-id'),
+                         condition=models.Q(is_published=True),
+                         name='post_feed_partial_idx',
+                         ),
+        )
 
     def __str__(self):
         return self.title
 
+    @cached_property
+    def image_variants(self):
+        return get_variants(self.image, self.image_width)
+
+    @property
+    def image_thumb_url(self):
+        if self.image_variants:
+            return self.image_variants.thumb_url
+        return self.image.url
+
+
+class CommentQuerySet(models.QuerySet):
+    """Выборки комментариев для страницы публикации"""
+
+    def published(self):
+        return self.filter(is_published=True)
+
+    def for_list(self):
+        """Только поля, которые выводит includes/comments.html."""
+        return self.select_related('author').only(
+            'text',
+            'created_at',
+            'post',
+            'author__username',
+        )
+
+    def thread(self, post_id):
+        """Опубликованные комментарии со страницы публикации."""
+        return self.filter(post_id=post_id).published().for_list()
+
 
 class Comment(Published):
     """Комментарий"""
@@ -105,7 +211,58 @@ class Comment(Published):
                                related_name='comment',
                                )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(fields=('post', 'created_at'),
+                         name='comment_post_created_at_idx',
+                         ),
+        )
+
+
+class Job(models.Model):
+    """Фоновая задача"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=64)
+    payload = models.JSONField('Параметры', default=dict, blank=True)
+    status = models.CharField('Статус',
+                              max_length=16,
+                              choices=STATUS_CHOICES,
+                              default=PENDING,
+                              )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Максимум попыток',
+                                                    default=3,
+                                                    )
+    run_after = models.DateTimeField('Не раньше', default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Начата', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('status', 'run_after'),
+                         name='job_status_run_after_idx',
+                         ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
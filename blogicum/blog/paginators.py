@@ -0,0 +1,190 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.cache import get_feed_count
+from blog.constants import (
+    CURSOR,
+    FEED_ORDERING,
+    PAGE_NUMBER,
+    POSTS_NUMBER_LIMIT,
+)
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class KeysetPage:
+    """Страница, полученная поиском по ключу сортировки."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not (self._has_next and self.object_list):
+            return None
+        return self.paginator.encode_cursor(FORWARD, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not (self._has_previous and self.object_list):
+            return None
+        return self.paginator.encode_cursor(BACKWARD, self.object_list[0])
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Страница выбирается условием на значения ключа последней
+    (или первой) записи соседней страницы, поэтому её стоимость
+    не зависит от глубины листания, а общий COUNT(*) не нужен.
+    Последнее поле ключа должно быть уникальным.
+    """
+
+    keyset = True
+
+    def __init__(self, object_list, per_page, ordering=FEED_ORDERING):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _field(self, name):
+        opts = self.object_list.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    @staticmethod
+    def _value(obj, name):
+        if isinstance(obj, dict):
+            return obj[name]
+        return getattr(obj, name)
+
+    @staticmethod
+    def _isoformat(value):
+        # DjangoJSONEncoder обрезает микросекунды, а ключ должен
+        # совпадать со значением в базе точно.
+        return value.isoformat()
+
+    def encode_cursor(self, direction, obj):
+        values = [self._value(obj, name) for name in self.fields]
+        payload = json.dumps([direction, values], default=self._isoformat)
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload, list) or len(payload) != 2:
+            raise ValueError('Malformed cursor.')
+        direction, values = payload
+        if direction not in (FORWARD, BACKWARD):
+            raise ValueError('Unknown cursor direction.')
+        if (not isinstance(values, list)
+                or len(values) != len(self.fields)):
+            raise ValueError('Cursor does not match the ordering.')
+        values = [
+            self._field(name).to_python(value)
+            for name, value in zip(self.fields, values)
+        ]
+        # Поля ключа не допускают NULL, а filter() не принимает None.
+        if None in values:
+            raise ValueError('Cursor contains empty values.')
+        return direction, values
+
+    def _seek(self, values, backward):
+        condition = Q()
+        for i, order in enumerate(self.ordering):
+            name = self.fields[i]
+            descending = order.startswith('-') != backward
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            step = Q(**{lookup: values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            order[1:] if order.startswith('-') else f'-{order}'
+            for order in self.ordering
+        ]
+
+    def page_queryset(self, direction=None, values=None):
+        """Запрос страницы с одной лишней записью: по ней видно,
+        есть ли следующая страница."""
+        queryset = self.object_list
+        if direction == BACKWARD:
+            return queryset.filter(
+                self._seek(values, backward=True),
+            ).order_by(*self._reversed_ordering())[:self.per_page + 1]
+        if direction == FORWARD:
+            queryset = queryset.filter(self._seek(values, backward=False))
+        return queryset.order_by(*self.ordering)[:self.per_page + 1]
+
+    def get_page(self, cursor=None):
+        """Вернуть страницу по курсору; неверный курсор — первая страница."""
+        direction, values = None, None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except (TypeError, ValueError, ValidationError):
+                direction, values = None, None
+        rows = list(self.page_queryset(direction, values))
+        if direction == BACKWARD:
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows, self, True, has_previous)
+        has_next = len(rows) > self.per_page
+        return KeysetPage(
+            rows[:self.per_page], self, has_next, direction is not None)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт общее число записей из счётчика ленты
+    вместо COUNT(*) на каждый запрос."""
+
+    def __init__(self, object_list, per_page, feed, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        return get_feed_count(self.feed, self.object_list.count)
+
+
+def paginate(request, object_list, feed, per_page=POSTS_NUMBER_LIMIT):
+    """Страница ленты: по курсору, если он передан, иначе по номеру."""
+    if CURSOR in request.GET:
+        return KeysetPaginator(object_list, per_page).get_page(
+            request.GET.get(CURSOR))
+    paginator = CachedCountPaginator(object_list, per_page, feed)
+    return paginator.get_page(request.GET.get(PAGE_NUMBER))
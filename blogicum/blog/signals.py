@@ -0,0 +1,343 @@
+import threading
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import (
+    adjust_feed_counts,
+    bump_generation,
+    forget_feed_counts,
+    forget_schedule,
+    post_page_tags,
+    purge_pages,
+)
+from blog.jobs import enqueue
+from blog.models import Category, Comment, Location, Post, User
+
+
+# Поля пользователя, которые выводятся на страницах блога.
+USER_PAGE_FIELDS = ('username', 'first_name', 'last_name', 'is_staff')
+
+
+def is_login_update(sender, update_fields=None, **kwargs):
+    """Вход пользователя сохраняет только last_login — на страницы
+    это не влияет."""
+    return sender is User and update_fields == frozenset({'last_login'})
+
+
+def after_commit(function, *args):
+    """Сбросить кэш сейчас и ещё раз после фиксации транзакции.
+
+    Первый сброс нужен чтениям внутри той же транзакции. Повторный
+    закрывает гонку: параллельный запрос мог до фиксации прочитать
+    старые строки и сохранить их в кэше под ключом нового поколения.
+    """
+    function(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(function, *args))
+
+
+deleting = threading.local()
+
+
+def deleting_posts():
+    """Удаляемые в этом потоке публикации: pk -> (индекс, колбэк)."""
+    if not hasattr(deleting, 'posts'):
+        deleting.posts = {}
+    return deleting.posts
+
+
+def is_cascade(comment):
+    """Комментарий удаляется вместе со своей публикацией.
+
+    Метка публикации живёт, пока на своём месте в run_on_commit
+    лежит её колбэк. Откат транзакции или точки сохранения колбэк
+    убирает — метка неудавшегося удаления больше не действует.
+    """
+    mark = deleting_posts().get(comment.post_id)
+    if mark is None:
+        return False
+    index, forget = mark
+    callbacks = transaction.get_connection().run_on_commit
+    return 0 <= index < len(callbacks) and callbacks[index][1] is forget
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, using, **kwargs):
+    """Комментарии удаляемой публикации удаляются каскадом: их
+    обработчики ничего не делают, кэш сбрасывает сама публикация.
+
+    Collector удаляет всегда внутри транзакции, поэтому колбэк
+    on_commit откладывается, а не выполняется сразу.
+    """
+    posts = deleting_posts()
+    forget = partial(posts.pop, instance.pk, None)
+    transaction.on_commit(forget, using=using)
+    callbacks = transaction.get_connection(using).run_on_commit
+    posts[instance.pk] = (len(callbacks) - 1, forget)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    deleting_posts().pop(instance.pk, None)
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0),
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, **kwargs):
+    instance._previous_post_id = None
+    instance._previous_published = False
+    if instance.pk and not raw:
+        previous = Comment.objects.filter(
+            pk=instance.pk,
+        ).values_list('post_id', 'is_published').first()
+        if previous:
+            (instance._previous_post_id,
+             instance._previous_published) = previous
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    """comment_count — число опубликованных комментариев: столько
+    их видно на странице публикации."""
+    if raw:
+        return
+    before = (
+        getattr(instance, '_previous_post_id', None)
+        if getattr(instance, '_previous_published', False) else None
+    )
+    after = instance.post_id if instance.is_published else None
+    if before == after:
+        return
+    if before:
+        change_comment_count(before, -1)
+    if after:
+        change_comment_count(after, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if is_cascade(instance) or not instance.is_published:
+        return
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post_card(sender, instance, **kwargs):
+    if is_cascade(instance):
+        return
+    after_commit(bump_generation, 'post', instance.post_id)
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id and previous_post_id != instance.post_id:
+        after_commit(bump_generation, 'post', previous_post_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=User)
+def invalidate_post_cards(sender, instance, **kwargs):
+    kinds = {
+        Post: 'post',
+        Category: 'category',
+        Location: 'location',
+        User: 'user',
+    }
+    after_commit(bump_generation, kinds[sender], instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_state(sender, instance, raw, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw and not is_login_update(sender, **kwargs):
+        instance._previous_state = User.objects.filter(
+            pk=instance.pk,
+        ).values(*USER_PAGE_FIELDS).first()
+
+
+def changed_user_fields(instance, created, raw):
+    """Изменённые поля из USER_PAGE_FIELDS.
+
+    Новый пользователь ещё не выводится ни на одной странице;
+    при загрузке фикстур прежнее состояние неизвестно — считаются
+    изменёнными все поля.
+    """
+    if raw:
+        return set(USER_PAGE_FIELDS)
+    previous = getattr(instance, '_previous_state', None)
+    if created or previous is None:
+        return set()
+    return {
+        name for name in USER_PAGE_FIELDS
+        if previous[name] != getattr(instance, name)
+    }
+
+
+@receiver(post_save, sender=User)
+def purge_user_pages(sender, instance, created, raw, **kwargs):
+    """Смена пароля, вход и регистрация страниц не меняют."""
+    changed = changed_user_fields(instance, created, raw)
+    if 'username' in changed:
+        # Имя автора есть в карточках и комментариях на всех лентах.
+        after_commit(bump_generation, 'user', instance.pk)
+        after_commit(purge_pages, 'posts')
+    elif changed:
+        after_commit(purge_pages, f'profile:{instance.username}')
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw:
+        instance._previous_state = Post.objects.filter(
+            pk=instance.pk,
+        ).values(
+            'category_id', 'author_id', 'is_published', 'pub_date', 'image',
+            'image_width',
+        ).first()
+    # Ширину изображения записывает фоновая задача: сохранение
+    # устаревшего экземпляра не должно её затирать, а для нового
+    # изображения она ещё неизвестна.
+    previous = instance._previous_state or {}
+    current = instance.image.name if instance.image else ''
+    instance.image_width = (
+        previous.get('image_width')
+        if current == (previous.get('image') or '') else None
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    after_commit(forget_schedule)
+    previous = getattr(instance, '_previous_state', None) or {}
+    after_commit(purge_pages, *post_page_tags(
+        post_ids=[instance.pk],
+        category_ids=[instance.category_id, previous.get('category_id')],
+        author_ids=[instance.author_id, previous.get('author_id')],
+    ))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    if is_cascade(instance):
+        return
+    post_ids = {
+        instance.post_id,
+        getattr(instance, '_previous_post_id', None),
+    } - {None}
+    posts = Post.objects.filter(pk__in=post_ids).values_list(
+        'category_id', 'author_id')
+    after_commit(purge_pages, *post_page_tags(
+        post_ids=post_ids,
+        category_ids=[category_id for category_id, _ in posts],
+        author_ids=[author_id for _, author_id in posts],
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=User)
+def purge_all_post_pages(sender, instance, **kwargs):
+    after_commit(purge_pages, 'posts')
+
+
+def post_feeds(state, published_category_ids, now):
+    """Ленты, в которые входит публикация в данном состоянии."""
+    feeds = [f'author:{state["author_id"]}']
+    if (state['is_published'] and state['pub_date'] <= now
+            and state['category_id'] in published_category_ids):
+        feeds += ['index', f'category:{state["category_id"]}']
+    return feeds
+
+
+def post_state(post):
+    return {
+        'category_id': post.category_id,
+        'author_id': post.author_id,
+        'is_published': post.is_published,
+        'pub_date': post.pub_date,
+    }
+
+
+def count_post_feeds(before, after):
+    states = [state for state in (before, after) if state]
+    published_category_ids = set(Category.objects.filter(
+        pk__in=[state['category_id'] for state in states],
+        is_published=True,
+    ).values_list('pk', flat=True))
+    now = timezone.now()
+    deltas = Counter()
+    if before:
+        deltas.subtract(post_feeds(before, published_category_ids, now))
+    if after:
+        deltas.update(post_feeds(after, published_category_ids, now))
+    adjust_feed_counts(deltas)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if raw or not (created or previous):
+        forget_feed_counts('index', f'category:{instance.category_id}',
+                           f'author:{instance.author_id}')
+        return
+    count_post_feeds(previous, post_state(instance))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    count_post_feeds(post_state(instance), None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def forget_category_feed_counts(sender, instance, **kwargs):
+    forget_feed_counts('index', f'category:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_jobs(sender, instance, created, raw, **kwargs):
+    """Обработка изображений уходит в фоновые задачи."""
+    if raw:
+        return
+    state = getattr(instance, '_previous_state', None) or {}
+    previous = state.get('image')
+    current = instance.image.name if instance.image else ''
+    if current == (previous or ''):
+        return
+    if current:
+        enqueue('process_post_image', post_id=instance.pk, name=current)
+    if previous:
+        enqueue('delete_post_image', name=previous,
+                width=state.get('image_width'))
+
+
+@receiver(post_delete, sender=Post)
+def enqueue_image_cleanup(sender, instance, **kwargs):
+    if instance.image:
+        enqueue('delete_post_image', name=instance.image.name,
+                width=instance.image_width)
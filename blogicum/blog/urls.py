@@ -1,6 +1,6 @@
 from django.urls import path
 
-from blog import views
+from blog import api, views
 
 
 app_name = 'blog'
@@ -50,4 +50,8 @@ urlpatterns = [
          views.CommentDeleteView.as_view(),
          name='delete_comment',
          ),
+    path('api/posts/',
+         api.post_list,
+         name='api_posts',
+         ),
 ]
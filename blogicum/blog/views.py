@@ -1,13 +1,19 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
-from blog.constants import PAGE_NUMBER, POSTS_NUMBER_LIMIT
+from blog.cache import cache_anonymous_page, conditional_page
+from blog.constants import (
+    COMMENTS_CURSOR,
+    COMMENTS_NUMBER_LIMIT,
+    COMMENTS_ORDERING,
+    CURSOR,
+    POSTS_NUMBER_LIMIT,
+)
 from blog.forms import CommentForm, PostForm, UserForm
 from blog.mixins import (
     CommentDispatchMixin,
@@ -15,51 +21,53 @@ from blog.mixins import (
     PostFormValidMixin,
 )
 from blog.models import Category, Comment, Post
+from blog.paginators import CachedCountPaginator, KeysetPaginator, paginate
+
+
+def index_tags():
+    return ('posts', 'index')
 
 
+@conditional_page(index_tags)
+@cache_anonymous_page(index_tags)
 def index(request):
-    post_list = Post.objects.select_related(
-        'location',
-        'author',
-        'category',
-    ).filter(
-        pub_date__lte=timezone.now(),
-        is_published=True,
-        category__is_published=True,
-    ).order_by(
-        '-pub_date',
-    ).annotate(
-        comment_count=Count('comment'),
-    )
+    post_list = Post.objects.published().feed()
 
-    paginator = Paginator(post_list, POSTS_NUMBER_LIMIT)
-    page_number = request.GET.get(PAGE_NUMBER)
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, post_list, 'index')
     context = {'page_obj': page_obj}
     return render(request, 'blog/index.html', context)
 
 
+def post_tags(id):
+    return ('posts', f'post:{id}')
+
+
+@conditional_page(post_tags)
+@cache_anonymous_page(post_tags)
 def post_detail(request, id):
     post_list = get_object_or_404(
-        Post.objects.select_related(
-            'location',
-            'author',
-            'category',
-        ).filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        ),
+        Post.objects.published().with_related(),
         pk=id,
     )
+    comments = KeysetPaginator(
+        Comment.objects.thread(id),
+        COMMENTS_NUMBER_LIMIT,
+        ordering=COMMENTS_ORDERING,
+    ).get_page(request.GET.get(COMMENTS_CURSOR))
     context = {
         'post': post_list,
         'form': CommentForm(),
-        'comments': Comment.objects.filter(post_id=id),
+        'comments': comments,
     }
     return render(request, 'blog/detail.html', context)
 
 
+def category_tags(category_slug):
+    return ('posts', f'category:{category_slug}')
+
+
+@conditional_page(category_tags)
+@cache_anonymous_page(category_tags)
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category.objects.filter(
@@ -67,41 +75,50 @@ def category_posts(request, category_slug):
             is_published=True,
         )
     )
-    post_list = category.post.filter(
-        pub_date__lte=timezone.now(),
-        is_published=True,
-    ).order_by(
-        '-pub_date',
-    ).annotate(
-        comment_count=Count('comment'),
-    )
-    paginator = Paginator(post_list, POSTS_NUMBER_LIMIT)
-    page_number = request.GET.get(PAGE_NUMBER)
-    page_obj = paginator.get_page(page_number)
+    post_list = category.post.published().feed()
+    page_obj = paginate(request, post_list, f'category:{category.pk}')
     context = {'page_obj': page_obj, 'category': category}
     return render(request, 'blog/category.html', context)
 
 
+def profile_tags(username):
+    return ('posts', f'profile:{username}')
+
+
+@method_decorator(
+    conditional_page(profile_tags),
+    name='dispatch',
+)
+@method_decorator(cache_anonymous_page(profile_tags), name='dispatch')
 class ProfileListView(ListView):
     model = Post
     template_name = 'blog/profile.html'
     ordering = 'id'
     paginate_by = POSTS_NUMBER_LIMIT
+    paginator_class = CachedCountPaginator
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
+        context['profile'] = self.author
+        return context
+
+    def get_queryset(self):
+        self.author = get_object_or_404(
             User,
             username=self.kwargs.get('username'),
         )
-        return context
+        return self.author.post.feed()
 
-    def get_queryset(self):
-        author = get_object_or_404(User, username=self.kwargs.get('username'))
-        result = author.post.annotate(
-            comment_count=Count('comment'),
-        ).order_by('-pub_date')
-        return result
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, feed=f'author:{self.author.pk}', **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if CURSOR not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        page = KeysetPaginator(queryset, page_size).get_page(
+            self.request.GET.get(CURSOR))
+        return page.paginator, page, page.object_list, page.has_other_pages()
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -114,6 +131,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', args=[username])
 
 
+@method_decorator(transaction.atomic, name='dispatch')
 class PostCreateView(PostFormValidMixin, CreateView):
     model = Post
     form_class = PostForm
@@ -124,6 +142,7 @@ class PostCreateView(PostFormValidMixin, CreateView):
         return reverse('blog:profile', args=[username])
 
 
+@method_decorator(transaction.atomic, name='dispatch')
 class PostUpdateView(PostFormValidMixin, PostDispatchMixin, UpdateView):
     model = Post
     form_class = PostForm
@@ -133,6 +152,7 @@ class PostUpdateView(PostFormValidMixin, PostDispatchMixin, UpdateView):
         return reverse('blog:post_detail', args=[self.kwargs['pk']])
 
 
+@method_decorator(transaction.atomic, name='dispatch')
 class PostDeleteView(LoginRequiredMixin, PostDispatchMixin, DeleteView):
     model = Post
     template_name = 'blog/create.html'
@@ -141,7 +161,7 @@ class PostDeleteView(LoginRequiredMixin, PostDispatchMixin, DeleteView):
         context = dict(
             **super().get_context_data(**kwargs),
             form={'instance': self.object},
-            comments=self.object.comment.all(),
+            comments=self.object.comment.published().for_list(),
         )
         return context
 
@@ -150,6 +170,7 @@ class PostDeleteView(LoginRequiredMixin, PostDispatchMixin, DeleteView):
         return reverse('blog:profile', kwargs={'username': username})
 
 
+@method_decorator(transaction.atomic, name='dispatch')
 class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
@@ -175,6 +196,7 @@ class CommentUpdateView(LoginRequiredMixin, CommentDispatchMixin, UpdateView):
         )
 
 
+@method_decorator(transaction.atomic, name='dispatch')
 class CommentDeleteView(LoginRequiredMixin, CommentDispatchMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
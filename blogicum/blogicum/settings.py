@@ -1,16 +1,40 @@
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = 'django-insecure-(^e94(n&&+wf7q5av9v@ehe&r=&pcj^9$s_59db#l8@g%t^@4q'
+# dev — разработка, test — прогон тестов, prod — боевой сервер.
+PROFILE = os.getenv('BLOGICUM_PROFILE', 'dev')
+
+if PROFILE not in ('dev', 'test', 'prod'):
+    raise ImproperlyConfigured(
+        f'BLOGICUM_PROFILE: неизвестный профиль {PROFILE!r}, '
+        'ожидается dev, test или prod.'
+    )
+
+SECRET_KEY = os.getenv(
+    'BLOGICUM_SECRET_KEY',
+    'django-insecure-(^e94(n&&+wf7q5av9v@ehe&r=&pcj^9$s_59db#l8@g%t^@4q',
+)
 
-DEBUG = True
+if PROFILE == 'prod' and 'BLOGICUM_SECRET_KEY' not in os.environ:
+    raise ImproperlyConfigured(
+        'В профиле prod задайте BLOGICUM_SECRET_KEY.'
+    )
+
+DEBUG = PROFILE == 'dev'
 
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
 ]
 
+if os.getenv('BLOGICUM_ALLOWED_HOSTS'):
+    ALLOWED_HOSTS = os.getenv('BLOGICUM_ALLOWED_HOSTS').split(',')
+
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
@@ -24,7 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pages.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -33,6 +59,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if PROFILE == 'prod':
+    # После раздачи статики: у неё уже есть сжатые .gz и .br.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('blogicum.staticfiles.StaticFilesMiddleware') + 1,
+        'django.middleware.gzip.GZipMiddleware',
+    )
+
 ROOT_URLCONF = 'blogicum.urls'
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -51,15 +84,112 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+TEMPLATE_WARMUP = PROFILE == 'prod'
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv(
+            'BLOGICUM_CONN_MAX_AGE', 60 if PROFILE == 'prod' else 0)),
     }
 }
 
+CACHE_DIR = Path(os.getenv('BLOGICUM_CACHE_DIR', BASE_DIR / 'cache'))
+
+PAGE_CACHE_DIR = os.getenv('BLOGICUM_PAGE_CACHE_DIR')
+
+MEMCACHED_LOCATION = os.getenv('BLOGICUM_MEMCACHED')
+
+# Без OPTIONS FileBasedCache хранит 300 записей и при переполнении
+# удаляет случайную треть, в том числе ключи поколений, — карточки
+# и страницы сбрасываются сами собой. Лимит рассчитан на корпус:
+# карточка и ключ поколения на публикацию, страницы лент и счётчики.
+# Каждая запись в файловый кеш перечисляет его каталог, поэтому
+# на больших корпусах лучше memcached (BLOGICUM_MEMCACHED).
+FILE_CACHE_OPTIONS = {
+    'MAX_ENTRIES': int(os.getenv('BLOGICUM_CACHE_MAX_ENTRIES', 100_000)),
+    'CULL_FREQUENCY': 10,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+}
+
+if PROFILE == 'prod':
+    # Кеш общий для всех воркеров: иначе сброс поколений и сессии
+    # видны только одному процессу.
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'default',
+        'OPTIONS': FILE_CACHE_OPTIONS,
+    }
+    # Сессии отдельно: вытеснение фрагментов их не трогает.
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'sessions',
+        'OPTIONS': FILE_CACHE_OPTIONS,
+    }
+    PAGE_CACHE_DIR = PAGE_CACHE_DIR or CACHE_DIR / 'pages'
+
+if PAGE_CACHE_DIR:
+    CACHES['pages'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': PAGE_CACHE_DIR,
+        'OPTIONS': FILE_CACHE_OPTIONS,
+    }
+
+if MEMCACHED_LOCATION:
+    if find_spec('pymemcache') is None:
+        raise ImproperlyConfigured(
+            'BLOGICUM_MEMCACHED задан, но pymemcache не установлен: '
+            'pip install -r requirements.txt.'
+        )
+    # Все общие кеши в memcached: атомарный incr держит счётчики лент
+    # точными, а запись не перечисляет каталог, как FileBasedCache.
+    for alias in ('default', 'pages', 'sessions'):
+        if alias in CACHES:
+            CACHES[alias] = {
+                'BACKEND': 'django.core.cache.backends.memcached.'
+                'PyMemcacheCache',
+                'LOCATION': MEMCACHED_LOCATION,
+                'KEY_PREFIX': alias,
+            }
+
+PAGE_CACHE_ALIAS = 'pages'
+
+# purge_pages() сбрасывает страницы во всех процессах только через общий
+# кэш страниц. С LocMemCache у каждого процесса своя копия, поэтому
+# срок короткий: чужие процессы отдают устаревшую страницу не дольше него.
+PAGE_CACHE_TIMEOUT = (
+    60 * 60 * 6 if PAGE_CACHE_DIR or MEMCACHED_LOCATION else 60 * 5)
+
+if PROFILE == 'prod':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sessions'
+
+if PROFILE == 'test':
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -93,6 +223,15 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_collected'
+
+# collectstatic пишет рядом с файлами .gz, а .br — только если
+# установлен Brotli из requirements.txt; без него отдаётся gzip.
+if PROFILE == 'prod':
+    STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = '/media/'
@@ -108,3 +247,32 @@ LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+TEMPLATE_PROFILE = os.getenv('BLOGICUM_TEMPLATE_PROFILE')
+
+SLOW_QUERY_LOG = os.getenv('BLOGICUM_SLOW_QUERY_LOG')
+
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv('BLOGICUM_SLOW_QUERY_MS', 100))
+
+if SLOW_QUERY_LOG:
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {
+            'slow_queries': {
+                'class': 'logging.handlers.RotatingFileHandler',
+                'filename': SLOW_QUERY_LOG,
+                'maxBytes': 10 * 1024 * 1024,
+                'backupCount': 5,
+                'encoding': 'utf-8',
+                'delay': True,
+            },
+        },
+        'loggers': {
+            'blogicum.slow_queries': {
+                'handlers': ['slow_queries'],
+                'level': 'WARNING',
+                'propagate': False,
+            },
+        },
+    }
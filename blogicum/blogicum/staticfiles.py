@@ -0,0 +1,123 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.xml', '.html',
+}
+MIN_COMPRESS_SIZE = 256
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SHORT_LIVED = 'public, max-age=60'
+ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+
+
+def compress(path):
+    """Записать рядом с файлом .gz и, если есть brotli, .br."""
+    with open(path, 'rb') as file:
+        content = file.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return []
+    compressed = [(path + '.gz', gzip.compress(content, 9, mtime=0))]
+    if brotli is not None:
+        compressed.append((path + '.br', brotli.compress(content)))
+    written = []
+    for target, data in compressed:
+        if len(data) < len(content):
+            with open(target, 'wb') as file:
+                file.write(data)
+            written.append(target)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище collectstatic: имена с хешем содержимого плюс
+    заранее сжатые .gz/.br копии для StaticFilesMiddleware."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Промежуточные имена из первых проходов на диске не остаются,
+        # поэтому сжимаются исходные и итоговые из манифеста.
+        for name in sorted({*paths, *self.hashed_files.values()}):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                compress(self.path(name))
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """Раздача STATIC_ROOT без отдельного веб-сервера.
+
+    Отдаёт сжатую копию по Accept-Encoding и кэширует файлы с хешем
+    в имени навсегда (immutable), остальные — ненадолго.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+
+    def __call__(self, request):
+        if (self.root and request.method in ('GET', 'HEAD')
+                and request.path.startswith(self.prefix)):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                                  stat.st_mtime, stat.st_size):
+            return HttpResponseNotModified()
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = accepted_encodings(request)
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                response = FileResponse(
+                    open(path + suffix, 'rb'),
+                    content_type=content_type or 'application/octet-stream',
+                    filename=os.path.basename(path),
+                )
+                response['Content-Encoding'] = encoding
+                break
+        else:
+            response = FileResponse(open(path, 'rb'))
+        if os.path.isfile(path + '.gz') or os.path.isfile(path + '.br'):
+            response['Vary'] = 'Accept-Encoding'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = (
+            IMMUTABLE if HASHED_NAME.search(name) else SHORT_LIVED)
+        return response
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pages'
+
+    def ready(self):
+        from django.conf import settings
+
+        from pages import slow_queries, template_profiler
+        slow_queries.install()
+        if settings.TEMPLATE_PROFILE:
+            template_profiler.install(settings.TEMPLATE_PROFILE)
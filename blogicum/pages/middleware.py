@@ -0,0 +1,44 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.db import connections
+
+from pages.perf import (
+    RequestTimings,
+    current_timings,
+    install_template_timer,
+    stats,
+)
+
+
+class PerformanceMiddleware:
+    """Замеры запроса: разбор URL, представление, шаблоны, SQL и размер
+    ответа. Отдаются в заголовке Server-Timing и копятся по
+    view_name для /pages/perf/."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.finish(response)
+        response['Server-Timing'] = timings.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            stats.add(match.view_name, timings.sample())
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.resolved = perf_counter()
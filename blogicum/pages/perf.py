@@ -0,0 +1,159 @@
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.template.backends.django import Template
+
+SAMPLE_SIZE = 1000
+PERCENTILES = (50, 90, 99)
+
+current_timings = ContextVar('pages_perf_timings', default=None)
+
+
+class RequestTimings:
+    """Замеры одного запроса, в секундах."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.resolved = None
+        self.finished = None
+        self.template = 0.0
+        self.sql = 0.0
+        self.queries = 0
+        self.size = None
+        self.rendering = False
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper: время и число запросов."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += perf_counter() - started
+            self.queries += 1
+
+    def finish(self, response):
+        self.finished = perf_counter()
+        if not response.streaming:
+            self.size = len(response.content)
+
+    @property
+    def total(self):
+        return self.finished - self.started
+
+    @property
+    def resolve(self):
+        """До process_view: разбор URL и middleware ниже нашего."""
+        if self.resolved is None:
+            return self.total
+        return self.resolved - self.started
+
+    @property
+    def view(self):
+        """Представление вместе с отрисовкой шаблона и SQL."""
+        if self.resolved is None:
+            return 0.0
+        return self.finished - self.resolved
+
+    def sample(self):
+        return {
+            'total': self.total,
+            'resolve': self.resolve,
+            'view': self.view,
+            'template': self.template,
+            'sql': self.sql,
+            'queries': self.queries,
+            'size': self.size or 0,
+        }
+
+    def server_timing(self):
+        metrics = [
+            ('resolve', self.resolve, None),
+            ('view', self.view, None),
+            ('template', self.template, None),
+            ('db', self.sql, f'{self.queries} queries'),
+            ('total', self.total, None),
+        ]
+        if self.size is not None:
+            metrics.append(('size', 0, f'{self.size} bytes'))
+        return ', '.join(
+            f'{name};dur={seconds * 1000:.2f}'
+            + (f';desc="{desc}"' if desc else '')
+            for name, seconds, desc in metrics
+        )
+
+
+def percentile(ordered, percent):
+    if not ordered:
+        return 0
+    return ordered[round(percent / 100 * (len(ordered) - 1))]
+
+
+class ViewStats:
+    """Последние SAMPLE_SIZE замеров каждого представления.
+
+    Хранятся в памяти процесса: у каждого воркера своя статистика.
+    """
+
+    def __init__(self, size=SAMPLE_SIZE):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=size))
+
+    def add(self, view_name, sample):
+        with self.lock:
+            self.samples[view_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {
+                name: list(items) for name, items in self.samples.items()}
+        rows = []
+        for name, items in sorted(samples.items()):
+            totals = sorted(item['total'] * 1000 for item in items)
+            row = {'view_name': name, 'count': len(items)}
+            for percent in PERCENTILES:
+                row[f'p{percent}'] = percentile(totals, percent)
+            for key in ('template', 'sql'):
+                row[key] = sum(item[key] for item in items) * 1000 / len(
+                    items)
+            row['queries'] = sum(item['queries'] for item in items) / len(
+                items)
+            row['size'] = sum(item['size'] for item in items) / len(items)
+            rows.append(row)
+        return rows
+
+
+stats = ViewStats()
+
+
+def install_template_timer():
+    """Учитывать время отрисовки шаблонов в замерах текущего запроса.
+
+    Считается только внешний вызов: шаблоны, отрисованные внутри
+    другого (карточки публикаций), уже входят в его время.
+    """
+    if getattr(Template.render, 'timed', False):
+        return
+    render = Template.render
+
+    @wraps(render)
+    def timed_render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None or timings.rendering:
+            return render(self, context, request)
+        timings.rendering = True
+        started = perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            timings.template += perf_counter() - started
+            timings.rendering = False
+
+    timed_render.timed = True
+    Template.render = timed_render
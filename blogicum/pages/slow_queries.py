@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import re
+import sys
+import threading
+import traceback
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('blogicum.slow_queries')
+
+STACK_DEPTH = 8
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*(?:(?:%s|\?)\s*,\s*)+(?:%s|\?)\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    """SQL без литералов и длины списков IN и его короткий хеш:
+    одинаковые по форме запросы попадают в одну запись."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    sql = sql.strip()
+    return sql, hashlib.md5(sql.encode()).hexdigest()[:12]
+
+
+def attribute(frame):
+    """Представление и строка шаблона, откуда пришёл запрос.
+
+    Шаблон определяется по ближайшему Node.render_annotated в стеке:
+    так видны ленивые запросы вроде post.category.is_published.
+    """
+    view = template = None
+    while frame is not None and view is None:
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', '')
+        owner = frame.f_locals.get('self')
+        if template is None and code.co_name == 'render_annotated':
+            origin = getattr(owner, 'origin', None)
+            token = getattr(owner, 'token', None)
+            if origin is not None:
+                template = '{}:{}'.format(
+                    origin.template_name or origin.name,
+                    getattr(token, 'lineno', '?'))
+        if module.rpartition('.')[2] == 'views' and not module.startswith(
+                'django.'):
+            name = code.co_name
+            if owner is not None and not isinstance(owner, type):
+                name = f'{type(owner).__name__}.{name}'
+            view = f'{module}.{name}'
+        frame = frame.f_back
+    return view, template
+
+
+def project_stack(frame):
+    """Кадры стека из кода проекта, последние STACK_DEPTH."""
+    root = str(settings.BASE_DIR)
+    frames = [
+        item for item in traceback.extract_stack(frame)
+        if item.filename.startswith(root) and item.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+class SlowQueryLog:
+    """Обёртка connection.execute_wrapper для медленных запросов.
+
+    Первый медленный запрос каждой формы пишется со стеком, затем
+    запись повторяется на 2-м, 4-м, 8-м... разе со счётчиком.
+    """
+
+    def __init__(self, threshold_ms):
+        self.threshold = threshold_ms / 1000
+        self.lock = threading.Lock()
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            if elapsed >= self.threshold:
+                self.record(sql, elapsed, sys._getframe(1))
+
+    def record(self, sql, elapsed, frame):
+        normalized, key = fingerprint(sql)
+        with self.lock:
+            self.counts[key] += 1
+            count = self.counts[key]
+        if count & (count - 1):
+            return
+        view, template = attribute(frame)
+        message = [
+            f'[{key}] x{count} {elapsed * 1000:.1f} ms '
+            f'view={view or "-"} template={template or "-"}',
+            normalized,
+        ]
+        if count == 1:
+            message.append(project_stack(frame).rstrip())
+        logger.warning('\n'.join(message))
+
+
+def install():
+    """Подключить журнал ко всем соединениям, если задан
+    SLOW_QUERY_LOG."""
+    if not getattr(settings, 'SLOW_QUERY_LOG', None):
+        return
+    slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS)
+
+    def add_wrapper(sender, connection, **kwargs):
+        if slow_query_log not in connection.execute_wrappers:
+            connection.execute_wrappers.append(slow_query_log)
+
+    connection_created.connect(add_wrapper, weak=False)
@@ -0,0 +1,182 @@
+"""Профилировщик отрисовки шаблонов.
+
+Замеряются Template.render (для каждого шаблона, в том числе
+подключённого через include), {% extends %}, {% include %}, {% url %},
+простые теги (simple_tag) и вызовы фильтров. Время копится по кадрам
+во всех запросах процесса: summary() — таблица по шаблонам и тегам,
+collapsed() — стеки в формате flamegraph.pl / speedscope
+(«a;b;c <мкс>»).
+
+Фильтры оборачиваются при разборе шаблона, поэтому install()
+и uninstall() сбрасывают кеш загрузчиков.
+"""
+import atexit
+import threading
+from collections import Counter, defaultdict
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+from django.template import engines
+from django.template.base import FilterExpression, Template
+from django.template.defaulttags import URLNode
+from django.template.library import SimpleNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+SUMMARY_SIZE = 50
+
+local = threading.local()
+
+
+class TemplateProfiler:
+    """Общее время, собственное время и число вызовов по кадрам."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.installed = False
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.stacks = Counter()
+            self.frames = defaultdict(lambda: {
+                'calls': 0, 'total': 0.0, 'own': 0.0})
+
+    def call(self, label, func, *args, **kwargs):
+        """Вызвать func(*args, **kwargs) как кадр label."""
+        stack = getattr(local, 'stack', None)
+        if stack is None:
+            stack = local.stack = []
+        entry = [label, 0.0]
+        stack.append(entry)
+        started = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            path = tuple(item[0] for item in stack)
+            self.record(path, label, elapsed, elapsed - entry[1])
+
+    def record(self, path, label, elapsed, own):
+        with self.lock:
+            self.stacks[path + (label,)] += own
+            frame = self.frames[label]
+            frame['calls'] += 1
+            frame['own'] += own
+            if label not in path:
+                frame['total'] += elapsed
+
+    def summary(self, size=SUMMARY_SIZE):
+        """Кадры по убыванию общего времени, время в мс."""
+        with self.lock:
+            frames = [
+                {'label': label, **values}
+                for label, values in self.frames.items()]
+        frames.sort(key=lambda frame: frame['total'], reverse=True)
+        for frame in frames:
+            frame['total'] *= 1000
+            frame['own'] *= 1000
+            frame['average'] = frame['total'] / frame['calls']
+        return frames[:size]
+
+    def collapsed(self):
+        """Строки «кадр;кадр;кадр <мкс собственного времени>»."""
+        with self.lock:
+            stacks = sorted(self.stacks.items())
+        lines = []
+        for path, own in stacks:
+            microseconds = round(own * 1_000_000)
+            if microseconds > 0:
+                frames = ';'.join(label.replace(';', ',') for label in path)
+                lines.append(f'{frames} {microseconds}\n')
+        return ''.join(lines)
+
+    def dump(self, path):
+        Path(path).write_text(self.collapsed(), encoding='utf-8')
+
+
+profiler = TemplateProfiler()
+
+
+def profiled(method, label):
+    """Метод узла или шаблона, замеряемый как кадр label(self)."""
+    @wraps(method)
+    def wrapper(self, context):
+        return profiler.call(label(self), method, self, context)
+    wrapper.original = method
+    return wrapper
+
+
+filters = {}
+
+
+def profiled_filter(func):
+    """Фильтр с теми же атрибутами (is_safe, needs_autoescape...)."""
+    if func not in filters:
+        label = 'filter ' + getattr(func, '_filter_name', func.__name__)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return profiler.call(label, func, *args, **kwargs)
+        filters[func] = wrapper
+    return filters[func]
+
+
+def profiled_init(init):
+    @wraps(init)
+    def wrapper(self, token, parser):
+        init(self, token, parser)
+        self.filters = [
+            (profiled_filter(func), args) for func, args in self.filters]
+    wrapper.original = init
+    return wrapper
+
+
+def literal(expression):
+    return str(getattr(expression, 'var', expression))
+
+
+PATCHES = (
+    (Template, 'render', lambda method: profiled(
+        method, lambda template: template.name or '<string>')),
+    (ExtendsNode, 'render', lambda method: profiled(
+        method, lambda node: literal(node.parent_name))),
+    (IncludeNode, 'render', lambda method: profiled(
+        method, lambda node: 'include ' + literal(node.template))),
+    (URLNode, 'render', lambda method: profiled(
+        method, lambda node: 'url ' + literal(node.view_name))),
+    (SimpleNode, 'render', lambda method: profiled(
+        method, lambda node: 'tag ' + node.func.__name__)),
+    (FilterExpression, '__init__', profiled_init),
+)
+
+
+def reset_loaders():
+    for backend in engines.all():
+        for loader in backend.engine.template_loaders:
+            loader.reset()
+
+
+def install(output=None):
+    """Включить профилировщик; при выходе из процесса записать стеки
+    в output, если он задан."""
+    if profiler.installed:
+        return
+    for owner, name, patch in PATCHES:
+        setattr(owner, name, patch(getattr(owner, name)))
+    profiler.installed = True
+    reset_loaders()
+    if output:
+        atexit.register(profiler.dump, output)
+
+
+def uninstall():
+    if not profiler.installed:
+        return
+    for owner, name, patch in PATCHES:
+        setattr(owner, name, getattr(owner, name).original)
+    profiler.installed = False
+    reset_loaders()
@@ -1,6 +1,8 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
+from pages import views
+
 app_name = 'pages'
 
 urlpatterns = [
@@ -12,4 +14,12 @@ urlpatterns = [
          TemplateView.as_view(template_name='pages/rules.html'),
          name='rules'
          ),
+    path('perf/',
+         views.PerfDashboardView.as_view(),
+         name='perf',
+         ),
+    path('perf/templates/',
+         views.TemplateProfileView.as_view(),
+         name='template_profile',
+         ),
 ]
@@ -1,4 +1,11 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.views.generic import TemplateView, View
+
+from pages.perf import stats
+from pages.template_profiler import profiler
 
 
 def page_not_found(request, exception):
@@ -11,3 +18,26 @@ def csrf_failure(request, reason=''):
 
 def server_error(request, reason=''):
     return render(request, 'pages/500.html', status=500)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class PerfDashboardView(TemplateView):
+    template_name = 'pages/perf.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(views=stats.summary(), **kwargs)
+        if profiler.installed:
+            context['templates'] = profiler.summary()
+        return context
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class TemplateProfileView(View):
+    """Стеки профилировщика шаблонов для flamegraph.pl/speedscope."""
+
+    def get(self, request):
+        response = HttpResponse(
+            profiler.collapsed(), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = (
+            'attachment; filename="templates.folded"')
+        return response
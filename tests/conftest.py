@@ -72,6 +72,7 @@ pytest_plugins = [
     'fixtures.locations',
     'fixtures.categories',
     'fixtures.comments',
+    'fixtures.queries',
     'adapters.comment',
 ]
 
@@ -322,6 +323,13 @@ def get_field_key(
         return (field_type.__name__, None)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture(scope='session', autouse=True)
 def cleanup(request):
     start_time = time.time()
@@ -334,7 +342,8 @@ def cleanup(request):
     for root, dirs, files in os.walk(image_dir):
         for filename in files:
             if (filename.endswith('.jpg') or filename.endswith(
-                    '.gif') or filename.endswith('.png')):
+                    '.gif') or filename.endswith('.png')
+                    or filename.endswith('.webp')):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
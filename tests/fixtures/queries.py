@@ -0,0 +1,119 @@
+"""Бюджеты SQL-запросов для представлений.
+
+QUERY_BUDGETS — наибольшее число запросов, которое представление
+может выполнить для анонимного посетителя; авторизованному клиенту
+добавляется SESSION_QUERIES. Повтор запроса одной формы (тот же SQL,
+параметры могут отличаться) — признак N+1 и тоже ошибка.
+С ключом --query-report в конце прогона выводятся самые частые
+повторы по представлениям.
+"""
+from collections import Counter, defaultdict
+from functools import wraps
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from pages.slow_queries import fingerprint
+
+QUERY_BUDGETS: Dict[str, int] = {
+    'blog:index': 3,
+    'blog:post_detail': 3,
+    'blog:category_posts': 4,
+    'blog:profile': 4,
+    'blog:api_posts': 1,
+    'pages:about': 0,
+    'pages:rules': 0,
+}
+SESSION_QUERIES = 2
+REPORT_SIZE = 5
+
+duplicated_queries: Dict[str, Counter] = defaultdict(Counter)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-report', action='store_true',
+        help='Вывести повторяющиеся SQL-запросы по представлениям.')
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption('query_report'):
+        return
+    terminalreporter.section('Повторяющиеся SQL-запросы')
+    if not duplicated_queries:
+        terminalreporter.write_line('Повторов не найдено.')
+    for label, statements in sorted(duplicated_queries.items()):
+        terminalreporter.write_line(f'{label}:')
+        for sql, count in statements.most_common(REPORT_SIZE):
+            terminalreporter.write_line(f'  {count} x {sql}')
+
+
+class QueryBudget(CaptureQueriesContext):
+    """Контекст, который падает, если внутри выполнено больше budget
+    запросов или один и тот же запрос повторился."""
+
+    def __init__(self, budget: int, label: str = '',
+                 allow_duplicates: bool = False):
+        super().__init__(connection)
+        self.budget = budget
+        self.label = label
+        self.allow_duplicates = allow_duplicates
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        statements = Counter(
+            fingerprint(query['sql'])[0] for query in self.captured_queries)
+        duplicated = {sql: n for sql, n in statements.items() if n > 1}
+        if duplicated:
+            duplicated_queries[self.label].update(duplicated)
+        executed = '\n'.join(
+            f'{i}. {query["sql"]}'
+            for i, query in enumerate(self.captured_queries, start=1))
+        assert len(self) <= self.budget, (
+            f'Убедитесь, что `{self.label}` выполняет не больше '
+            f'{self.budget} SQL-запросов; выполнено {len(self)}:\n{executed}'
+        )
+        assert self.allow_duplicates or not duplicated, (
+            f'Убедитесь, что `{self.label}` не повторяет одинаковые '
+            'SQL-запросы (N+1):\n' + '\n'.join(duplicated)
+        )
+
+
+def max_queries(budget: int, allow_duplicates: bool = False) -> Callable:
+    """Декоратор теста: тело теста (без фикстур) укладывается
+    в budget запросов."""
+    def decorator(test):
+        @wraps(test)
+        def wrapper(*args, **kwargs):
+            with QueryBudget(budget, test.__name__, allow_duplicates):
+                return test(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., QueryBudget]:
+    """with query_budget(3, 'описание'): ..."""
+    return QueryBudget
+
+
+@pytest.fixture
+def get_within_budget() -> Callable[..., HttpResponse]:
+    """GET-запрос с проверкой бюджета представления из QUERY_BUDGETS."""
+    def get(client: Client, url: str, authenticated: bool = False,
+            **kwargs) -> HttpResponse:
+        view_name = resolve(urlsplit(url).path).view_name
+        budget = QUERY_BUDGETS[view_name]
+        if authenticated:
+            budget += SESSION_QUERIES
+        with QueryBudget(budget, view_name):
+            return client.get(url, **kwargs)
+    return get
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+URL = '/api/posts/'
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category, published_location):
+    pub_date = timezone.now() - timedelta(days=1)
+    published = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, pub_date=pub_date, is_published=True)
+    mixer.blend('blog.Post', category=published_category,
+                is_published=False)
+    mixer.blend('blog.Post', category=published_category,
+                pub_date=timezone.now() + timedelta(days=1))
+    return published
+
+
+def test_api_lists_published_posts(client, api_posts, user):
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get(URL).json()
+    assert len(queries) == 1, (
+        'Убедитесь, что `/api/posts/` выбирает публикации вместе '
+        'с автором, категорией и местоположением одним запросом.'
+    )
+    assert [post['id'] for post in data['results']] == sorted(
+        (post.id for post in api_posts), reverse=True)
+    first = data['results'][0]
+    assert first['author'] == {'username': user.username}
+    assert first['location'] == {'name': api_posts[0].location.name}
+    assert data['next'] is None
+
+
+def test_api_sparse_fields_and_cursor(client, api_posts):
+    response = client.get(URL, {'fields': 'id,title', 'limit': 2})
+    data = response.json()
+    assert [set(post) for post in data['results']] == [{'id', 'title'}] * 2, (
+        'Убедитесь, что параметр `fields` ограничивает поля ответа.'
+    )
+    seen = [post['id'] for post in data['results']]
+    while data['next']:
+        data = client.get(data['next']).json()
+        seen.extend(post['id'] for post in data['results'])
+    assert seen == sorted((post.id for post in api_posts), reverse=True)
+
+
+def test_api_rejects_unknown_fields(client):
+    response = client.get(URL, {'fields': 'id,password'})
+    assert response.status_code == 400
@@ -0,0 +1,242 @@
+import re
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import post_card_stats, release_scheduled_posts
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_post_card_fragment_cache(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    hits = post_card_stats['hits']
+    content = user_client.get('/').content.decode('utf-8')
+    assert post_card_stats['hits'] == hits + 1
+    assert post.title in content
+
+    post.title = 'Изменённый заголовок'
+    post.save()
+    assert post.title in user_client.get('/').content.decode('utf-8')
+
+    post.category.title = 'Переименованная категория'
+    post.category.save()
+    assert post.category.title in user_client.get('/').content.decode('utf-8')
+
+    mixer.blend('blog.Comment', post=post)
+    assert '(1)' in user_client.get('/').content.decode('utf-8')
+
+
+def test_anonymous_page_cache(mixer, unlogged_client, user_client, user,
+                              published_category):
+    other_category = mixer.blend('blog.Category', is_published=True)
+    category_url = f'/category/{published_category.slug}/'
+    other_url = f'/category/{other_category.slug}/'
+    for url in ('/', category_url, other_url):
+        assert unlogged_client.get(url).context is not None
+        assert unlogged_client.get(url).context is None, (
+            f'Убедитесь, что страница `{url}` для анонимного посетителя '
+            'отдаётся из кэша.'
+        )
+    assert user_client.get('/').context is not None
+
+    post = mixer.blend('blog.Post', category=published_category,
+                       author=user, location=None)
+    for url in ('/', category_url):
+        assert post.title in unlogged_client.get(url).content.decode('utf-8')
+    assert unlogged_client.get(other_url).context is None
+
+
+def test_scheduled_post_goes_live(mixer, unlogged_client, user,
+                                  published_category):
+    now = timezone.now()
+    post = mixer.blend('blog.Post', category=published_category,
+                       author=user, location=None, is_published=True,
+                       pub_date=now + timedelta(hours=1))
+    assert 0 < release_scheduled_posts() <= 60 * 60, (
+        'Убедитесь, что страницы кэшируются не дольше, чем до выхода '
+        'ближайшей отложенной публикации.'
+    )
+    assert post.title not in unlogged_client.get('/').content.decode()
+    assert unlogged_client.get('/').context is None
+
+    later = now + timedelta(hours=2)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        content = unlogged_client.get('/').content.decode('utf-8')
+    assert post.title in content, (
+        'Убедитесь, что отложенная публикация появляется на закэшированной '
+        'главной странице, как только наступает её время.'
+    )
+
+
+def test_feed_count_is_cached_and_adjusted(
+        mixer, user_client, user, published_category,
+        many_posts_with_published_locations):
+    total = len(many_posts_with_published_locations)
+    page_obj = user_client.get('/').context['page_obj']
+    assert page_obj.paginator.count == total
+
+    mixer.blend('blog.Post', category=published_category, author=user,
+                is_published=True, pub_date=timezone.now())
+    mixer.blend('blog.Post', category=published_category, author=user,
+                is_published=False)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get('/', {'page': 2})
+    assert not any('COUNT(' in query['sql'] for query in queries), (
+        'Убедитесь, что число публикаций в ленте берётся из кэша.'
+    )
+    assert response.context['page_obj'].paginator.count == total + 1
+
+    many_posts_with_published_locations[0].delete()
+    page_obj = user_client.get('/').context['page_obj']
+    assert page_obj.paginator.count == total
+
+
+@pytest.mark.parametrize('url', [
+    '/',
+    '/posts/{post.id}/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+])
+def test_page_cache_hit_without_queries(
+        django_assert_num_queries, unlogged_client,
+        post_with_published_location, url):
+    url = url.format(post=post_with_published_location)
+    unlogged_client.get(url)
+    with django_assert_num_queries(0):
+        response = unlogged_client.get(url)
+    assert response.has_header('ETag'), (
+        f'Убедитесь, что страница `{url}` из кэша отдаётся с ETag '
+        'и без запросов к базе.'
+    )
+
+
+@pytest.mark.parametrize('url', [
+    '/',
+    '/posts/{post.id}/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+])
+def test_conditional_get(django_assert_max_num_queries, user_client,
+                         post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(post=post)
+    response = user_client.get(url)
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified')
+
+    with django_assert_max_num_queries(3):
+        not_modified = user_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == 304, (
+        f'Убедитесь, что страница `{url}` отвечает 304, если её ETag '
+        'не изменился.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    changed = user_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert changed.status_code == 200
+
+
+def _csrf_token(response):
+    return re.search(
+        r'name="csrfmiddlewaretoken" value="([^"]+)"',
+        response.content.decode(),
+    ).group(1)
+
+
+def test_etag_changes_after_relogin(user, post_with_published_location):
+    user.set_password('password')
+    user.save()
+    client = Client(enforce_csrf_checks=True)
+
+    def login():
+        client.post('/auth/login/', {
+            'username': user.username,
+            'password': 'password',
+            'csrfmiddlewaretoken': _csrf_token(client.get('/auth/login/')),
+        })
+
+    url = f'/posts/{post_with_published_location.id}/'
+    login()
+    response = client.get(url)
+    client.post('/auth/logout/',
+                {'csrfmiddlewaretoken': _csrf_token(response)})
+    login()
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 200, (
+        'Убедитесь, что после повторного входа страница с формой '
+        'не отдаётся как 304: в ней устаревший CSRF-токен.'
+    )
+    comment = client.post(f'{url}comment/', {
+        'text': 'Комментарий',
+        'csrfmiddlewaretoken': _csrf_token(response),
+    })
+    assert comment.status_code == 302
+
+
+def test_pages_purged_again_after_commit(
+        unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    with TestCase.captureOnCommitCallbacks(execute=True) as callbacks:
+        post.title = 'Новый заголовок'
+        post.save()
+        # Параллельный запрос до фиксации кэширует страницу под ключом
+        # нового поколения.
+        unlogged_client.get('/')
+    assert callbacks
+    assert unlogged_client.get('/').context is not None, (
+        'Убедитесь, что страницы сбрасываются ещё раз после фиксации '
+        'транзакции.'
+    )
+
+
+def test_post_card_invalidated_again_after_commit(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        mixer.blend('blog.Comment', post=post)
+        user_client.get('/')
+    misses = post_card_stats['misses']
+    user_client.get('/')
+    assert post_card_stats['misses'] == misses + 1, (
+        'Убедитесь, что карточка публикации сбрасывается ещё раз после '
+        'фиксации транзакции.'
+    )
+
+
+def test_user_changes_purge_only_rendered_fields(
+        mixer, unlogged_client, user, post_with_published_location):
+    profile_url = f'/profile/{user.username}/'
+    for url in ('/', profile_url):
+        unlogged_client.get(url)
+    mixer.blend(get_user_model())
+    user.set_password('new-password')
+    user.save()
+    for url in ('/', profile_url):
+        assert unlogged_client.get(url).context is None, (
+            'Убедитесь, что регистрация и смена пароля не сбрасывают '
+            'кэш страниц.'
+        )
+
+    user.first_name = 'Имя'
+    user.save()
+    assert unlogged_client.get('/').context is None
+    assert 'Имя' in unlogged_client.get(profile_url).content.decode()
+
+    user.username = 'renamed'
+    user.save()
+    assert '@renamed' in unlogged_client.get('/').content.decode()
@@ -0,0 +1,103 @@
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.db.models.signals import pre_delete
+
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что `comment_count` увеличивается при создании '
+        'комментария.'
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что `comment_count` уменьшается при удалении '
+        'комментария.'
+    )
+
+
+def test_only_published_comments_counted(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    hidden = mixer.blend('blog.Comment', post=post, is_published=False)
+    shown = mixer.blend('blog.Comment', post=post, is_published=True)
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что `comment_count` считает только опубликованные '
+        'комментарии — те, что видны на странице публикации.'
+    )
+    hidden.is_published = True
+    hidden.save()
+    shown.is_published = False
+    shown.save()
+    shown.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_comment_moved_to_another_post(mixer, post_with_published_location):
+    source = post_with_published_location
+    target = mixer.blend('blog.Post', category=source.category)
+    comment = mixer.blend('blog.Comment', post=source)
+    comment.post = target
+    comment.save()
+    source.refresh_from_db()
+    target.refresh_from_db()
+    assert (source.comment_count, target.comment_count) == (0, 1)
+
+
+def test_post_delete_skips_comment_signals(
+        mixer, django_assert_max_num_queries, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(50).blend('blog.Comment', post=post)
+    # Выборка и удаление комментариев, публикации, задача для картинки
+    # и сброс кэша — без запросов на каждый комментарий.
+    with django_assert_max_num_queries(10):
+        post.delete()
+    other = mixer.blend('blog.Post', category=post.category)
+    comment = mixer.blend('blog.Comment', post=other)
+    comment.delete()
+    other.refresh_from_db()
+    assert other.comment_count == 0
+
+
+def test_reconcile_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post, is_published=True)
+    mixer.blend('blog.Comment', post=post, is_published=False)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    call_command('reconcile_comment_counts', batch_size=1, stdout=None)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_failed_post_delete_forgets_cascade(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend('blog.Comment', post=post)
+
+    def fail(sender, instance, **kwargs):
+        raise DatabaseError('disk I/O error')
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(DatabaseError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что после неудачного удаления публикации её '
+        'комментарии снова учитываются в `comment_count`.'
+    )
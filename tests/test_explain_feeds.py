@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.explain_feeds import plan_problems
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_feeds_use_indexes(many_posts_with_published_locations):
+    stdout = StringIO()
+    call_command('explain_feeds', '--fail-on-scan', stdout=stdout)
+    output = stdout.getvalue()
+    assert 'category_posts.cursor' in output
+    assert 'Полных просмотров таблиц блога и сортировок не найдено.' in (
+        output), (
+        'Убедитесь, что запросы лент используют индексы, '
+        'а не полный просмотр или сортировку таблиц блога.'
+    )
+
+
+@pytest.mark.parametrize('plan', [
+    '4 0 0 SCAN blog_post',
+    '8 0 0 SEARCH blog_post USING INDEX post_category_pub_date_idx '
+    '(category_id=?)\n30 0 0 USE TEMP B-TREE FOR ORDER BY',
+    'Limit  (cost=1.1..1.2 rows=10)\n  ->  Sort  (cost=1.1..1.2 rows=50)\n'
+    '        Sort Key: pub_date DESC, id DESC',
+    'Limit\n  ->  Incremental Sort\n        Presorted Key: pub_date',
+])
+def test_plan_problems(plan):
+    assert plan_problems(plan), (
+        'Убедитесь, что explain_feeds находит в плане полный просмотр '
+        'таблицы и сортировку.'
+    )
+
+
+def test_index_plan_has_no_problems():
+    assert not plan_problems(
+        '8 0 0 SEARCH blog_post USING INDEX post_feed_partial_idx '
+        '(pub_date<?)\n'
+        'Limit\n  ->  Index Scan using post_feed_partial_idx on blog_post'
+    )
@@ -0,0 +1,35 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_export_blog_ndjson(mixer, post_with_published_location):
+    mixer.cycle(3).blend('blog.Comment', post=post_with_published_location)
+    out = StringIO()
+    call_command('export_blog', 'post', 'comment', chunk_size=2, stdout=out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row['model'] for row in rows] == ['post'] + ['comment'] * 3, (
+        'Убедитесь, что `export_blog` выгружает по строке NDJSON '
+        'на каждую запись.'
+    )
+    assert rows[0]['title'] == post_with_published_location.title
+
+
+def test_export_admin_action_streams_csv(
+        admin_client, post_with_published_location):
+    response = admin_client.post('/admin/blog/post/', {
+        'action': 'export_csv',
+        '_selected_action': [post_with_published_location.pk],
+    })
+    assert response.streaming
+    assert response['Content-Type'] == 'text/csv'
+    content = b''.join(response.streaming_content).decode()
+    header, row = csv.reader(StringIO(content))
+    assert row[header.index('id')] == str(post_with_published_location.pk)
@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.fast_loaddata import JSONArrayReader
+from blog.models import Comment, Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+DB_JSON = Path(__file__).resolve().parent.parent / 'db.json'
+EXCLUDE = ('-e', 'auth.permission', '-e', 'admin', '-e', 'sessions')
+
+
+def test_reader_streams_array_items():
+    items = [{'pk': i, 'text': 'x' * i} for i in range(50)]
+    reader = JSONArrayReader(StringIO(json.dumps(items, indent=2)),
+                             chunk_size=7)
+    assert list(reader) == items
+
+
+def test_fast_loaddata_db_json():
+    out = StringIO()
+    call_command('fast_loaddata', str(DB_JSON), *EXCLUDE,
+                 '--batch-size', '5', stdout=out)
+    fixture = json.loads(DB_JSON.read_text(encoding='utf-8'))
+    posts = {item['pk']: item for item in fixture
+             if item['model'] == 'blog.post'}
+    assert Post.objects.count() == len(posts), (
+        'Убедитесь, что `fast_loaddata` загружает все публикации фикстуры.'
+    )
+    post = Post.objects.get(pk=min(posts))
+    assert post.created_at.isoformat().startswith(
+        posts[post.pk]['fields']['created_at'][:19]), (
+        'Убедитесь, что `fast_loaddata` сохраняет `created_at` из фикстуры.'
+    )
+
+
+def test_fast_loaddata_counts_comments(
+        tmp_path, mixer, user, post_with_published_location):
+    post = post_with_published_location
+    fixture = tmp_path / 'comments.json'
+    fixture.write_text(json.dumps([
+        {'model': 'blog.comment', 'pk': 100 + i, 'fields': {
+            'text': 'text', 'post': post.pk, 'author': user.pk,
+            'is_published': True, 'created_at': '2022-12-18T23:03:52Z'}}
+        for i in range(3)
+    ]))
+    call_command('fast_loaddata', str(fixture), stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    mixer.blend('blog.Comment', post=post)
+    assert Comment.objects.filter(post=post).count() == 4
@@ -0,0 +1,28 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Q
+
+from blog.models import Category, Comment, Post, User
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_generate_corpus():
+    call_command('generate_corpus', users=5, posts=40, comments=200,
+                 categories=4, batch_size=16, seed=1, scheduled=0.5,
+                 stdout=StringIO())
+    assert (User.objects.count(), Post.objects.count(),
+            Comment.objects.count()) == (5, 40, 200), (
+        'Убедитесь, что `generate_corpus` создаёт заданное число записей.'
+    )
+    assert Category.objects.count() == 4
+    assert Post.objects.filter(pub_date__gt=F('created_at')).exists()
+    assert not Post.objects.annotate(
+        actual=Count('comment', filter=Q(comment__is_published=True)),
+    ).exclude(comment_count=F('actual')).exists(), (
+        'Убедитесь, что после генерации `comment_count` пересчитан.'
+    )
@@ -0,0 +1,147 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.constants import POST_IMAGE_WIDTHS
+from blog import images
+from blog.images import source_name, strip_metadata, variant_names
+from blog.jobs import enqueue, handlers, run_pending
+from blog.models import Job
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _upload(name='photo.jpg', size=(2000, 1000)):
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+def test_variants_generated_on_upload(
+        media_root, mixer, user_client, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, is_published=True,
+        image=_upload())
+    assert not (media_root / variant_names(post.image.name)[0]).exists(), (
+        'Убедитесь, что изображение обрабатывается фоновой задачей, '
+        'а не во время запроса.'
+    )
+    assert run_pending() == [Job.DONE]
+    with Image.open(media_root / post.image.name) as image:
+        assert not image.getexif(), (
+            'Убедитесь, что из загруженного изображения удаляется EXIF.'
+        )
+    for name in variant_names(post.image.name):
+        assert (media_root / name).exists(), (
+            'Убедитесь, что при загрузке изображения публикации создаются '
+            'его уменьшенные копии в форматах WebP и JPEG.'
+        )
+        assert source_name(name) == post.image.name
+        with Image.open(media_root / name) as image:
+            assert image.width in POST_IMAGE_WIDTHS
+    assert post.image_thumb_url.endswith('.640w.jpg')
+
+    content = user_client.get('/').content.decode()
+    assert 'srcset=' in content and '.1280w.webp 1280w' in content, (
+        'Убедитесь, что в ленте изображение публикации выводится '
+        'через `srcset` из уменьшенных копий.'
+    )
+
+
+def test_narrow_image_is_not_upscaled(
+        media_root, mixer, user_client, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, is_published=True,
+        image=_upload(size=(500, 250)))
+    run_pending()
+    post.refresh_from_db()
+    assert post.image_width == 500
+    assert sorted(
+        path.name.rsplit('.', 2)[1]
+        for path in (media_root / 'post_images' / 'variants').iterdir()
+    ) == ['320w', '320w', '500w', '500w'], (
+        'Убедитесь, что копии не бывают шире исходного изображения.'
+    )
+    assert post.image_thumb_url.endswith('.500w.jpg')
+    content = user_client.get('/').content.decode()
+    assert '.500w.webp 500w' in content
+    assert '640w' not in content and '1280w' not in content, (
+        'Убедитесь, что `srcset` не предлагает ширины больше исходной.'
+    )
+
+
+def test_unreadable_image_falls_back_to_original(
+        media_root, mixer, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, is_published=True,
+        image=SimpleUploadedFile('broken.png', b'not an image'))
+    run_pending()
+    assert post.image_variants is None
+    assert post.image_thumb_url == post.image.url
+
+
+def test_replaced_image_is_deleted(media_root, mixer, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=_upload())
+    run_pending()
+    old_name = post.image.name
+    post.image = _upload('other.jpg')
+    post.save()
+    run_pending()
+    assert not (media_root / old_name).exists()
+    assert not any(
+        (media_root / name).exists() for name in variant_names(old_name))
+    assert (media_root / post.image.name).exists()
+
+
+def test_failed_strip_keeps_original(
+        media_root, mixer, published_category, monkeypatch):
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=_upload())
+    original = (media_root / post.image.name).read_bytes()
+
+    def fail(source, target):
+        raise OSError('disk is full')
+
+    monkeypatch.setattr(images.os, 'replace', fail)
+    with pytest.raises(OSError):
+        strip_metadata(post.image.name, post.image.storage)
+    assert (media_root / post.image.name).read_bytes() == original, (
+        'Убедитесь, что при ошибке записи исходное изображение '
+        'остаётся на месте.'
+    )
+    assert [path.name for path in (media_root / 'post_images').iterdir()
+            ] == [post.image.name.rsplit('/', 1)[1]]
+
+
+def test_failed_job_is_retried(db, monkeypatch):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise OSError('disk is full')
+
+    monkeypatch.setitem(handlers, 'flaky', flaky)
+    job = enqueue('flaky')
+    assert run_pending() == [Job.PENDING]
+    job.refresh_from_db()
+    assert job.attempts == 1 and 'disk is full' in job.last_error
+    Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+    run_pending()
+    Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+    assert run_pending() == [Job.FAILED] and len(calls) == 3, (
+        'Убедитесь, что упавшая задача перезапускается, пока не '
+        'исчерпает число попыток.'
+    )
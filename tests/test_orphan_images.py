@@ -0,0 +1,73 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.images import variant_name
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _touch(path, age=60 * 60 * 24):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'image')
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return path
+
+
+@pytest.fixture
+def media(settings, tmp_path, mixer, published_category):
+    settings.MEDIA_ROOT = tmp_path
+    live = 'post_images/live.jpg'
+    mixer.blend('blog.Post', category=published_category, image=live)
+    return {
+        'live': [_touch(tmp_path / live),
+                 _touch(tmp_path / variant_name(live, 640, 'webp'))],
+        'orphans': [_touch(tmp_path / 'post_images/gone.jpg'),
+                    _touch(tmp_path / variant_name('post_images/gone.jpg',
+                                                   320, 'jpg'))],
+        'fresh': [_touch(tmp_path / 'post_images/uploading.jpg', age=0)],
+    }
+
+
+def _run(*args):
+    out = StringIO()
+    call_command('collect_orphan_images', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_dry_run_reports_orphans(media):
+    assert 'Найдено файлов-сирот: 2' in _run('--dry-run')
+    assert all(path.exists() for paths in media.values() for path in paths)
+
+
+def test_orphans_deleted(media):
+    _run('--chunk-size', '1')
+    assert not any(path.exists() for path in media['orphans']), (
+        'Убедитесь, что изображения без публикаций и их копии удаляются.'
+    )
+    assert all(path.exists() for path in media['live'] + media['fresh'])
+
+
+def test_orphans_quarantined(media, tmp_path):
+    quarantine = tmp_path / 'quarantine'
+    _run('--quarantine', str(quarantine))
+    assert (quarantine / 'post_images/gone.jpg').exists()
+    assert not any(path.exists() for path in media['orphans'])
+
+
+def test_orphans_rechecked_per_chunk(media, django_assert_num_queries):
+    root = media['live'][0].parents[1]
+    for number in range(20):
+        _touch(root / f'post_images/gone_{number}.jpg')
+    with django_assert_num_queries(2):
+        output = _run()
+    assert 'Удалено файлов: 22' in output, (
+        'Убедитесь, что порция файлов перепроверяется одним запросом, '
+        'а не запросом на каждый файл.'
+    )
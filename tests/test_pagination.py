@@ -0,0 +1,99 @@
+import base64
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.constants import COMMENTS_NUMBER_LIMIT
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def posts_with_equal_pub_dates(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date, is_published=True)
+
+
+def _walk(client, url):
+    seen = []
+    response = client.get(url, {'cursor': ''})
+    while True:
+        page_obj = response.context['page_obj']
+        assert len(page_obj) <= N_PER_PAGE
+        seen.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            return seen, page_obj
+        response = client.get(url, {'cursor': page_obj.next_cursor})
+
+
+def test_cursor_walk(user_client, user, posts_with_equal_pub_dates):
+    expected = sorted(
+        (post.id for post in posts_with_equal_pub_dates), reverse=True)
+    for url in ('/', f'/profile/{user.username}/',
+                f'/category/{posts_with_equal_pub_dates[0].category.slug}/'):
+        seen, last_page = _walk(user_client, url)
+        assert seen == expected, (
+            f'Убедитесь, что листание по курсору на странице `{url}` '
+            'выдаёт каждую публикацию ровно один раз и по порядку.'
+        )
+        response = user_client.get(
+            url, {'cursor': last_page.previous_cursor})
+        previous = [post.id for post in response.context['page_obj']]
+        assert previous == expected[-len(last_page) - N_PER_PAGE:
+                                    -len(last_page)]
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+INVALID_CURSORS = (
+    'not-a-cursor',
+    _cursor('["n", [null, null]]'),
+    _cursor('["p", [null, 1]]'),
+    _cursor('["n", ["2020-01-01T00:00:00", null]]'),
+    _cursor('{"n": [1, 2]}'),
+    _cursor('["n", {"a": 1, "b": 2}]'),
+    _cursor('"np"'),
+)
+
+
+@pytest.mark.parametrize('cursor', INVALID_CURSORS)
+def test_invalid_cursor_falls_back_to_first_page(
+        user_client, posts_with_equal_pub_dates, cursor):
+    response = user_client.get('/', {'cursor': cursor})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
+    assert not response.context['page_obj'].has_previous()
+    assert user_client.get(
+        '/api/posts/', {'cursor': cursor}).status_code == 200
+    post = posts_with_equal_pub_dates[0]
+    response = user_client.get(
+        f'/posts/{post.id}/', {'comments_cursor': cursor})
+    assert response.status_code == 200, (
+        'Убедитесь, что неверный курсор открывает первую страницу, '
+        'а не приводит к ошибке.'
+    )
+
+
+def test_comments_load_more(mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_NUMBER_LIMIT + 2).blend(
+        'blog.Comment', post=post, is_published=True)
+    mixer.blend('blog.Comment', post=post, is_published=False)
+    url = f'/posts/{post.id}/'
+    first = user_client.get(url).context['comments']
+    assert len(first) == COMMENTS_NUMBER_LIMIT and first.has_next()
+    rest = user_client.get(
+        url, {'comments_cursor': first.next_cursor}).context['comments']
+    seen = [c.id for c in first] + [c.id for c in rest]
+    assert seen == [c.id for c in comments], (
+        'Убедитесь, что на странице публикации выводятся только '
+        'опубликованные комментарии, порциями и по порядку.'
+    )
@@ -0,0 +1,34 @@
+import pytest
+
+from pages.perf import stats
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    stats.clear()
+    response = user_client.get(f'/posts/{post_with_published_location.id}/')
+    timing = response['Server-Timing']
+    for metric in ('resolve;dur=', 'view;dur=', 'template;dur=', 'db;dur=',
+                   'total;dur=', 'size;dur='):
+        assert metric in timing, (
+            'Убедитесь, что заголовок `Server-Timing` содержит замеры '
+            'разбора URL, представления, шаблонов, SQL и размер ответа.'
+        )
+    [sample] = stats.samples['blog:post_detail']
+    assert sample['queries'] > 0 and sample['template'] > 0
+    assert sample['size'] == len(response.content)
+
+
+def test_perf_dashboard_is_staff_only(
+        admin_client, user_client, post_with_published_location):
+    stats.clear()
+    user_client.get('/')
+    assert user_client.get('/pages/perf/').status_code == 302, (
+        'Убедитесь, что страница `/pages/perf/` доступна только персоналу.'
+    )
+    response = admin_client.get('/pages/perf/')
+    assert response.status_code == 200
+    assert 'blog:index' in response.content.decode()
@@ -0,0 +1,70 @@
+import pytest
+
+from blog.models import Post
+
+from blog.cache import release_scheduled_posts
+from fixtures.queries import QueryBudget, max_queries
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+URLS = (
+    '/',
+    '/?cursor=',
+    '/?page=2',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+    '/api/posts/',
+    '/pages/about/',
+    '/pages/rules/',
+)
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_anonymous_query_budget(
+        get_within_budget, unlogged_client,
+        many_posts_with_published_locations, url):
+    url = url.format(post=many_posts_with_published_locations[0])
+    release_scheduled_posts()
+    response = get_within_budget(unlogged_client, url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_authenticated_query_budget(
+        get_within_budget, user_client,
+        many_posts_with_published_locations, url):
+    url = url.format(post=many_posts_with_published_locations[0])
+    release_scheduled_posts()
+    response = get_within_budget(user_client, url, authenticated=True)
+    assert response.status_code == 200
+
+
+def test_post_detail_comments_query_count(
+        query_budget, mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    release_scheduled_posts()
+    with query_budget(3, 'blog:post_detail'):
+        response = unlogged_client.get(f'/posts/{post.id}/')
+    assert response.content.decode('utf-8').count('name="comment_') == 5
+
+
+@pytest.fixture
+def schedule_known(post_with_published_location):
+    release_scheduled_posts()
+
+
+@max_queries(2)
+def test_cursor_page_skips_count(unlogged_client, schedule_known):
+    unlogged_client.get('/', {'cursor': ''})
+
+
+def test_per_row_lookup_is_flagged(many_posts_with_published_locations):
+    posts = many_posts_with_published_locations[:3]
+    with pytest.raises(AssertionError, match='N\\+1'):
+        with QueryBudget(10, 'posts'):
+            for post in posts:
+                Post.objects.get(pk=post.pk)
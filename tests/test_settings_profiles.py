@@ -0,0 +1,129 @@
+import runpy
+
+import pytest
+from django.core.checks import run_checks
+from django.core.exceptions import ImproperlyConfigured
+
+
+@pytest.fixture
+def load_settings(settings, monkeypatch, tmp_path):
+    path = settings.BASE_DIR / 'blogicum' / 'settings.py'
+
+    def load(profile, secret_key='prod-secret', memcached=None):
+        monkeypatch.setenv('BLOGICUM_PROFILE', profile)
+        if secret_key:
+            monkeypatch.setenv('BLOGICUM_SECRET_KEY', secret_key)
+        else:
+            monkeypatch.delenv('BLOGICUM_SECRET_KEY', raising=False)
+        monkeypatch.setenv('BLOGICUM_CACHE_DIR', str(tmp_path))
+        monkeypatch.delenv('BLOGICUM_PAGE_CACHE_DIR', raising=False)
+        if memcached:
+            monkeypatch.setenv('BLOGICUM_MEMCACHED', memcached)
+        else:
+            monkeypatch.delenv('BLOGICUM_MEMCACHED', raising=False)
+        return runpy.run_path(str(path))
+    return load
+
+
+def test_prod_profile(load_settings):
+    prod = load_settings('prod')
+    assert not prod['DEBUG']
+    assert prod['DATABASES']['default']['CONN_MAX_AGE'] > 0
+    assert prod['SESSION_ENGINE'].endswith('cached_db')
+    assert 'django.middleware.gzip.GZipMiddleware' in prod['MIDDLEWARE']
+    assert prod['TEMPLATE_WARMUP']
+    assert prod['PAGE_CACHE_TIMEOUT'] == 60 * 60 * 6
+    assert prod['SESSION_CACHE_ALIAS'] == 'sessions'
+    for alias in ('default', 'pages', 'sessions'):
+        config = prod['CACHES'][alias]
+        assert 'FileBasedCache' in config['BACKEND'], (
+            'Убедитесь, что в профиле prod кеш общий для всех процессов.'
+        )
+        assert config['OPTIONS']['MAX_ENTRIES'] > 300, (
+            'Убедитесь, что лимит файлового кеша рассчитан на корпус.'
+        )
+
+
+def test_prod_profile_requires_secret_key(load_settings):
+    assert load_settings('dev', secret_key=None)['SECRET_KEY']
+    with pytest.raises(ImproperlyConfigured):
+        load_settings('prod', secret_key=None)
+
+
+def test_memcached_profile(load_settings, monkeypatch):
+    monkeypatch.setattr(
+        'importlib.util.find_spec', lambda name: object())
+    prod = load_settings('prod', memcached='127.0.0.1:11211')
+    for alias in ('default', 'pages', 'sessions'):
+        assert prod['CACHES'][alias]['BACKEND'].endswith(
+            'PyMemcacheCache'), (
+            'Убедитесь, что BLOGICUM_MEMCACHED переводит в memcached '
+            'все общие кеши.'
+        )
+    assert prod['PAGE_CACHE_TIMEOUT'] == 60 * 60 * 6
+
+
+def test_memcached_requires_pymemcache(load_settings, monkeypatch):
+    monkeypatch.setattr('importlib.util.find_spec', lambda name: None)
+    with pytest.raises(ImproperlyConfigured, match='pymemcache'):
+        load_settings('prod', memcached='127.0.0.1:11211')
+
+
+def test_dev_profile_is_default(load_settings):
+    dev = load_settings('dev')
+    assert dev['DEBUG']
+    assert dev['DATABASES']['default']['CONN_MAX_AGE'] == 0
+    assert dev['PAGE_CACHE_TIMEOUT'] <= 60 * 5, (
+        'Убедитесь, что без общего кэша страниц срок их хранения короткий.'
+    )
+    assert 'django.middleware.gzip.GZipMiddleware' not in dev['MIDDLEWARE']
+
+
+def test_unknown_profile(load_settings):
+    with pytest.raises(ImproperlyConfigured):
+        load_settings('staging')
+
+
+def test_performance_deploy_checks(settings):
+    ids = {
+        message.id for message in run_checks(
+            tags=['performance'], include_deployment_checks=True)
+    }
+    assert {'blog.W002', 'blog.W003', 'blog.W004', 'blog.W006'} <= ids, (
+        'Убедитесь, что `check --deploy --tag performance` сообщает '
+        'о настройках, которые мешают производительности.'
+    )
+    settings.MIDDLEWARE = settings.MIDDLEWARE + [
+        'django.middleware.gzip.GZipMiddleware']
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    ids = {
+        message.id for message in run_checks(
+            tags=['performance'], include_deployment_checks=True)
+    }
+    assert not {'blog.W004', 'blog.W006'} & ids
+
+
+def test_file_cache_without_limit_reported(settings, tmp_path):
+    settings.CACHES = dict(settings.CACHES, files={
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    })
+    messages = run_checks(
+        tags=['performance'], include_deployment_checks=True)
+    assert [message.obj for message in messages
+            if message.id == 'blog.W009'] == ['files']
+
+
+def test_file_cache_writes_reported(settings, tmp_path):
+    settings.CACHES = dict(settings.CACHES, files={
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+        'OPTIONS': {'MAX_ENTRIES': 100_000},
+    })
+    messages = run_checks(
+        tags=['performance'], include_deployment_checks=True)
+    assert [message.obj for message in messages
+            if message.id == 'blog.W010'] == ['files'], (
+        'Убедитесь, что `check --deploy` предупреждает о цене записи '
+        'в файловый кеш.'
+    )
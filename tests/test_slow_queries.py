@@ -0,0 +1,51 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.template import Context, Template
+
+from blog.models import Post
+
+from pages.slow_queries import SlowQueryLog, fingerprint
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_fingerprint_ignores_literals():
+    first, key = fingerprint("SELECT * FROM t WHERE id IN (1, 2) AND a = 'x'")
+    second, other_key = fingerprint(
+        "SELECT *  FROM t WHERE id IN (3, 4, 5) AND a = 'y'")
+    assert first == second and key == other_key
+
+
+def test_slow_queries_attributed(caplog, user_client, mixer,
+                                 post_with_published_location):
+    post = post_with_published_location
+    slow_query_log = SlowQueryLog(threshold_ms=0)
+    with caplog.at_level(logging.WARNING, logger='blogicum.slow_queries'):
+        with connection.execute_wrapper(slow_query_log):
+            user_client.get(f'/posts/{post.id}/')
+            user_client.get(f'/posts/{post.id}/')
+    messages = [record.getMessage() for record in caplog.records]
+    assert any('view=blog.views.post_detail' in message
+               for message in messages), (
+        'Убедитесь, что в журнале медленных запросов указано '
+        'представление, из которого выполнен запрос.'
+    )
+    assert any(' x2 ' in message for message in messages)
+
+
+def test_lazy_template_query_attributed(
+        caplog, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    with caplog.at_level(logging.WARNING, logger='blogicum.slow_queries'):
+        with connection.execute_wrapper(SlowQueryLog(threshold_ms=0)):
+            Template('\n{{ post.author.username }}').render(
+                Context({'post': post}))
+    [record] = caplog.records
+    assert 'template=<unknown source>:2' in record.getMessage(), (
+        'Убедитесь, что для ленивых запросов из шаблона указывается '
+        'шаблон и строка.'
+    )
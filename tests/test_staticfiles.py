@@ -0,0 +1,41 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStaticFilesStorage')
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_fingerprints_and_compresses(collected):
+    name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    assert name != 'css/bootstrap.min.css', (
+        'Убедитесь, что collectstatic добавляет к именам файлов хеш '
+        'содержимого.'
+    )
+    original = (collected / name).read_bytes()
+    assert gzip.decompress((collected / f'{name}.gz').read_bytes()) == (
+        original)
+
+
+def test_middleware_serves_precompressed_file(collected, client, settings):
+    url = settings.STATIC_URL + staticfiles_storage.stored_name(
+        'css/bootstrap.min.css')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert 'immutable' in response['Cache-Control']
+    assert response['Vary'] == 'Accept-Encoding'
+
+    plain = client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+    assert not plain.has_header('Content-Encoding')
+    assert b''.join(plain.streaming_content) == gzip.decompress(
+        b''.join(response.streaming_content))
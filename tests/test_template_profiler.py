@@ -0,0 +1,49 @@
+import pytest
+
+from pages import template_profiler
+from pages.template_profiler import profiler
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def profiling():
+    template_profiler.install()
+    profiler.clear()
+    yield profiler
+    template_profiler.uninstall()
+    profiler.clear()
+
+
+def test_feed_render_profiled(profiling, unlogged_client,
+                              many_posts_with_published_locations):
+    assert unlogged_client.get('/').status_code == 200
+    labels = {row['label'] for row in profiling.summary(size=None)}
+    for label in ('blog/index.html', 'base.html',
+                  'tag post_card', 'includes/post_card.html',
+                  'include includes/category_link.html',
+                  'url blog:post_detail', 'filter date'):
+        assert label in labels, (
+            f'Убедитесь, что профилировщик шаблонов учитывает `{label}`.'
+        )
+    stacks = profiling.collapsed().splitlines()
+    assert any(
+        line.startswith('blog/index.html;base.html;')
+        and ';tag post_card;includes/post_card.html;include ' in line
+        for line in stacks
+    ), 'Убедитесь, что стеки вложены: шаблон, extends, тег, include.'
+    for line in stacks:
+        frames, microseconds = line.rsplit(' ', 1)
+        assert int(microseconds) > 0
+
+
+def test_template_profile_download(profiling, admin_client,
+                                   post_with_published_location):
+    admin_client.get(f'/posts/{post_with_published_location.id}/')
+    response = admin_client.get('/pages/perf/templates/')
+    assert response.status_code == 200
+    assert 'blog/detail.html' in response.content.decode()
+    response = admin_client.get('/pages/perf/')
+    assert 'filter date' in response.content.decode()
@@ -0,0 +1,47 @@
+import pytest
+from django.core.checks import run_checks
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from blog.warmup import warm_templates
+
+
+def test_warm_templates_command(capsys):
+    call_command('warm_templates')
+    assert 'Скомпилировано шаблонов' in capsys.readouterr().out
+
+
+@pytest.fixture
+def broken_templates(settings, tmp_path):
+    (tmp_path / 'good.html').write_text('{{ value|upper }}')
+    (tmp_path / 'broken.html').write_text('{% if %}')
+    template_settings = dict(settings.TEMPLATES[0], DIRS=[tmp_path])
+    template_settings['APP_DIRS'] = False
+    template_settings['OPTIONS'] = dict(
+        template_settings['OPTIONS'],
+        loaders=[('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+        ])],
+    )
+    settings.TEMPLATES = [template_settings]
+    return tmp_path
+
+
+def test_warm_up_fills_cached_loader(broken_templates):
+    compiled, elapsed, failed = warm_templates()
+    assert compiled == 1
+    assert [name for name, error in failed] == ['broken.html']
+    [loader] = engines['django'].engine.template_loaders
+    assert 'good.html' in loader.get_template_cache, (
+        'Убедитесь, что прогрев сохраняет скомпилированные шаблоны '
+        'в кеше загрузчика.'
+    )
+
+
+def test_broken_template_reported(broken_templates):
+    errors = run_checks(tags=['templates'])
+    assert [error.obj for error in errors if error.id == 'blog.E001'] == [
+        'broken.html'
+    ], 'Убедитесь, что проверка сообщает о шаблонах, которые не компилируются.'
+    with pytest.raises(CommandError):
+        call_command('warm_templates')